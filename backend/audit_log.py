@@ -0,0 +1,106 @@
+"""Buffered audit log: requests enqueue, a background task writes batches.
+
+Writing each audit row in its own transaction put a commit on every login
+attempt, so a password-guessing flood was paced by the database's commit rate.
+record() only appends to a bounded in-memory queue (O(1), never waits for the
+database); run() wakes every interval seconds, or as soon as batch_size rows
+are waiting, and inserts each batch in one transaction with executemany.
+
+When the queue is full new rows are dropped rather than blocking requests;
+drops and write failures are counted and logged from the writer loop. A batch
+whose write fails is put back at the front of the queue (as far as it fits) and
+retried on the next cycle. flush() drains everything, and runs on shutdown.
+"""
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        table: Table,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        interval: float = 0.25,
+    ):
+        self.engine = engine
+        self.table = table
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: deque = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._lock = asyncio.Lock()  # one batch in flight at a time
+        self.written = 0
+        self.dropped = 0
+        self.failed_writes = 0
+        self._reported_drops = 0
+
+    def record(self, event: str, username: Optional[str], ip: Optional[str], extra: Optional[str] = None) -> None:
+        """Queue one row; call from the event loop thread."""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append({"ts": datetime.utcnow(), "event": event, "username": username, "ip": ip, "extra": extra})
+        if self._wake is not None and len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    async def _write_batch(self) -> int:
+        async with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return 0
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.execute(insert(self.table), batch)
+            except Exception as e:
+                self.failed_writes += 1
+                room = self.max_queue - len(self._queue)
+                self._queue.extendleft(reversed(batch[:room]))
+                self.dropped += max(0, len(batch) - room)
+                logging.error(f"Audit log write failed ({len(batch)} rows): {e}")
+                return 0
+            self.written += len(batch)
+            return len(batch)
+
+    async def flush(self) -> int:
+        """Write everything queued now; returns how many rows were written."""
+        total = 0
+        while self._queue:
+            n = await self._write_batch()
+            if not n:
+                break
+            total += n
+        return total
+
+    def _report_drops(self) -> None:
+        if self.dropped > self._reported_drops:
+            logging.error(f"Audit log queue full: dropped {self.dropped - self._reported_drops} rows "
+                          f"({self.dropped} since start)")
+            self._reported_drops = self.dropped
+
+    async def run(self):
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            self._report_drops()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_writes": self.failed_writes,
+        }
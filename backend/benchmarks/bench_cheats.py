@@ -0,0 +1,67 @@
+"""Benchmark: compiled cheat index build time, size and lookup latency.
+
+Run from backend/:  python benchmarks/bench_cheats.py [--db-dir DIR] [--lookups 20000]
+
+Compiles the bsnes databases into a temporary index, then times cheats_body() for
+random hits and misses. For reference it also times answering a lookup by
+re-parsing Cheat Codes.bml, which is what serving cheats without an index would cost.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bml  # noqa: E402
+from rom_database import CHEAT_SOURCE, RomDatabase  # noqa: E402
+
+DEFAULT_DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "bsnes", "bsnes-nightly", "Database")
+
+
+def _pct(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def run(db_dir: str, lookups: int):
+    src = os.path.join(db_dir, CHEAT_SOURCE)
+    index_path = os.path.join(tempfile.mkdtemp(prefix="bench-cheats-"), "romdb.sqlite3")
+    db = RomDatabase(db_dir, index_path)
+    stats = db.compile()
+    db.ensure()
+    print(f"source   {os.path.getsize(src) / 1e6:8.2f} MB  ({CHEAT_SOURCE})")
+    print(f"index    {stats['bytes'] / 1e6:8.2f} MB  ({stats['cartridges']} cartridges, {stats['games']} games)")
+    print(f"build    {stats['seconds'] * 1000:8.1f} ms")
+
+    hashes = [n.get("sha256") for n in bml.parse_file(src) if n.name == "cartridge" and n.get("sha256")]
+    rng = random.Random(1)
+    for label, keys in (
+        ("hit", [rng.choice(hashes) for _ in range(lookups)]),
+        ("miss", ["%064x" % rng.getrandbits(256) for _ in range(lookups)]),
+    ):
+        samples = []
+        for k in keys:
+            t = time.perf_counter()
+            db.cheats_body(k)
+            samples.append(time.perf_counter() - t)
+        print(f"lookup {label:<5} p50 {statistics.median(samples) * 1e6:7.1f} us"
+              f"  p99 {_pct(samples, 0.99) * 1e6:7.1f} us  ({lookups} lookups)")
+
+    samples = []
+    for k in [rng.choice(hashes) for _ in range(5)]:
+        t = time.perf_counter()
+        next((n for n in bml.parse_file(src) if n.name == "cartridge" and n.get("sha256") == k), None)
+        samples.append(time.perf_counter() - t)
+    print(f"no index (parse BML per lookup) p50 {statistics.median(samples) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db-dir", default=os.getenv("BSNES_DATABASE_DIR", DEFAULT_DB_DIR))
+    ap.add_argument("--lookups", type=int, default=20000)
+    args = ap.parse_args()
+    run(args.db_dir, args.lookups)
@@ -0,0 +1,137 @@
+"""Benchmark: readers against concurrent writers on the app's SQLite database.
+
+Run from backend/:  python benchmarks/bench_db_concurrency.py [--readers 8] [--writers 2] [--seconds 5]
+
+Writers commit audit rows one at a time, as _audit does, and every tenth
+transaction is a bulk one: --txn-kb of rows written while the request is busy
+for --hold-ms before it commits. Readers meanwhile load the pages table and look
+up users, as page and admin GETs do. Compared:
+  default  create_engine() as the app used it: rollback journal, default pool
+  tuned    db_config engines: WAL, synchronous=NORMAL, pooled, with readers on
+           the query_only engine
+Reported: reader latency, reader throughput, writer commits/s and any
+"database is locked" errors.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_config import create_app_engine  # noqa: E402
+
+SCHEMA = (
+    "CREATE TABLE pages (id INTEGER PRIMARY KEY, name TEXT UNIQUE, content TEXT)",
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE, email TEXT)",
+    "CREATE TABLE audit_logs (id INTEGER PRIMARY KEY, ts TEXT, event TEXT, username TEXT, ip TEXT, extra TEXT)",
+)
+
+
+def _setup(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for stmt in SCHEMA:
+            conn.exec_driver_sql(stmt)
+        conn.exec_driver_sql(
+            "INSERT INTO pages (name, content) VALUES (?, ?)",
+            [(f"page{i}", "x" * 2000) for i in range(40)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO users (username, email) VALUES (?, ?)",
+            [(f"user{i}", f"user{i}@example.com") for i in range(20000)],
+        )
+    engine.dispose()
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def _run(write_engine, read_engine, readers: int, writers: int, seconds: float, txn_bytes: int, hold: float):
+    stop = threading.Event()
+    latencies, commits, errors = [], [0], [0]
+    lock = threading.Lock()
+
+    def reader(seed):
+        local = []
+        i = seed
+        while not stop.is_set():
+            i += 7919
+            t = time.perf_counter()
+            try:
+                with read_engine.connect() as conn:
+                    conn.exec_driver_sql("SELECT name, content FROM pages").fetchall()
+                    conn.exec_driver_sql("SELECT id FROM users WHERE username = ?", (f"user{i % 20000}",)).fetchall()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(local)
+
+    def writer(seed):
+        n = 0
+        while not stop.is_set():
+            try:
+                with write_engine.begin() as conn:
+                    rows = txn_bytes // 1024 if n % 10 == 9 else 1
+                    conn.exec_driver_sql(
+                        "INSERT INTO audit_logs (ts, event, username, ip, extra) VALUES (datetime('now'), ?, ?, ?, ?)",
+                        [("login_success", f"user{seed}", "10.0.0.1", os.urandom(512).hex())] * rows,
+                    )
+                    if rows > 1:
+                        time.sleep(hold)
+                n += 1
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            commits[0] += n
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return len(latencies) / seconds, _pct(latencies, 0.5), _pct(latencies, 0.99), max(latencies or [0]), commits[0] / seconds, errors[0]
+
+
+def run(readers: int, writers: int, seconds: float, txn_kb: int, hold_ms: float):
+    tmp = tempfile.mkdtemp(prefix="bench-db-")
+    print(f"{readers} readers, {writers} writers, {seconds:g} s each")
+    for name in ("default", "tuned"):
+        path = os.path.join(tmp, f"{name}.sqlite3")
+        _setup(path)
+        url = f"sqlite:///{path}"
+        if name == "default":
+            write_engine = read_engine = create_engine(url, connect_args={"check_same_thread": False})
+        else:
+            write_engine = create_app_engine(url)
+            read_engine = create_app_engine(url, read_only=True)
+        reads, p50, p99, worst, commits, errors = _run(write_engine, read_engine, readers, writers, seconds, txn_kb * 1024, hold_ms / 1000)
+        print(f"  {name:<8} reads {reads:7.0f}/s  p50 {p50 * 1e3:6.2f} ms  p99 {p99 * 1e3:7.2f} ms"
+              f"  max {worst * 1e3:7.1f} ms   writes {commits:6.0f} commits/s   locked errors {errors}")
+        write_engine.dispose()
+        read_engine.dispose()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--readers", type=int, default=8)
+    ap.add_argument("--writers", type=int, default=2)
+    ap.add_argument("--seconds", type=float, default=5)
+    ap.add_argument("--txn-kb", type=int, default=4096)
+    ap.add_argument("--hold-ms", type=float, default=20)
+    args = ap.parse_args()
+    run(args.readers, args.writers, args.seconds, args.txn_kb, args.hold_ms)
@@ -0,0 +1,93 @@
+"""Benchmark: a burst of logins against other requests sharing the server.
+
+Run from backend/:  python benchmarks/bench_hashing.py [--logins 200] [--rounds 10]
+
+  threadpool  bcrypt in the request threadpool (40 threads, as Starlette's default),
+              the way sync endpoints ran it before
+  hasher      bcrypt in PasswordHasher's process pool, awaited by the event loop
+
+While the logins run, a trivial sync "request" is submitted to the request
+threadpool every 10 ms; its latency shows whether other endpoints starve. In
+hasher mode logins beyond max_pending are rejected (503) instead of queued.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_hashing import HasherBusy, PasswordHasher, _verify  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+async def _other_requests(pool, stop, latencies):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t = time.perf_counter()
+        await loop.run_in_executor(pool, lambda: None)
+        latencies.append(time.perf_counter() - t)
+        await asyncio.sleep(0.01)
+
+
+async def _burst(name, login, logins, pool):
+    stop = asyncio.Event()
+    other = []
+    sampler = asyncio.create_task(_other_requests(pool, stop, other))
+    done, rejected = [], 0
+
+    async def one():
+        nonlocal rejected
+        t = time.perf_counter()
+        try:
+            await login()
+        except HasherBusy:
+            rejected += 1
+            return
+        done.append(time.perf_counter() - t)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    print(f"  {name:<10} {len(done) / elapsed:6.1f} logins/s  login p50 {_pct(done, 0.5) * 1e3:7.0f} ms"
+          f"  p99 {_pct(done, 0.99) * 1e3:7.0f} ms  rejected {rejected:4d}"
+          f"  other requests p99 {_pct(other, 0.99) * 1e3:7.1f} ms")
+
+
+async def run(logins: int, rounds: int, workers: int, max_pending: int):
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+    print(f"{logins} concurrent logins, bcrypt cost {rounds}, {os.cpu_count()} cores")
+    loop = asyncio.get_running_loop()
+
+    pool = ThreadPoolExecutor(40)
+    await _burst("threadpool", lambda: loop.run_in_executor(pool, _verify, PASSWORD, hashed), logins, pool)
+    pool.shutdown()
+
+    pool = ThreadPoolExecutor(40)
+    hasher = PasswordHasher(workers, max_pending, rounds)
+    await hasher.verify(PASSWORD, hashed)  # start the workers outside the timing
+    await _burst("hasher", lambda: hasher.verify(PASSWORD, hashed), logins, pool)
+    hasher.shutdown()
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--logins", type=int, default=200)
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--max-pending", type=int, default=0)
+    args = ap.parse_args()
+    asyncio.run(run(args.logins, args.rounds, args.workers, args.max_pending))
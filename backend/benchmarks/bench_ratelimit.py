@@ -0,0 +1,134 @@
+"""Benchmark: rate limiter contention under concurrent logins.
+
+Run from backend/:  python benchmarks/bench_ratelimit.py [--threads 16] [--ops 20000] [--procs 4]
+
+Each login does what /api/token does: one check on the per-IP key and, for a share of
+attempts, one on the per-user key. Compared:
+  deque   the previous per-key timestamp deques behind one global lock
+  memory  GCRA in a dict (single process)
+  sqlite  GCRA in a shared WAL file, from threads and from several processes
+It also checks that processes sharing the SQLite file enforce one combined limit,
+and how much memory each in-process store holds after the run.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import MemoryRateLimiter, SQLiteRateLimiter  # noqa: E402
+
+WINDOW = 900
+IP_LIMIT = 20
+USER_LIMIT = 8
+
+
+class DequeLimiter:
+    """The previous implementation, for comparison."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        with self._lock:
+            q = self._buckets.setdefault(key, deque())
+            while q and (now - q[0]) > window:
+                q.popleft()
+            if len(q) >= limit:
+                return False, max(1, int(window - (now - q[0])))
+            q.append(now)
+            return True, 0
+
+
+def _login(limiter, rng):
+    limiter.hit(f"login_ip:10.0.{rng.randrange(64)}.{rng.randrange(256)}", IP_LIMIT, WINDOW)
+    if rng.random() < 0.3:
+        limiter.hit(f"login_user:user{rng.randrange(5000)}", USER_LIMIT, WINDOW)
+
+
+def _threads(limiter, threads: int, ops: int):
+    per_thread = ops // threads
+    latencies = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(per_thread):
+            t = time.perf_counter()
+            _login(limiter, rng)
+            local.append(time.perf_counter() - t)
+        latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return per_thread * threads / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def _proc_worker(args):
+    path, threads, ops, seed = args
+    return _threads(SQLiteRateLimiter(path), threads, ops)[0]
+
+
+def _proc_same_key(args):
+    path, attempts = args
+    limiter = SQLiteRateLimiter(path)
+    return sum(1 for _ in range(attempts) if limiter.hit("login_user:shared", 50, 3600)[0])
+
+
+def run(threads: int, ops: int, procs: int):
+    tmp = tempfile.mkdtemp(prefix="bench-ratelimit-")
+    print(f"{threads} threads, {ops} logins per run")
+    for name, make in (
+        ("deque", DequeLimiter),
+        ("memory", MemoryRateLimiter),
+        ("sqlite", lambda: SQLiteRateLimiter(os.path.join(tmp, "threads.sqlite3"))),
+    ):
+        tracemalloc.start()
+        limiter = make()
+        rate, p50, p99 = _threads(limiter, threads, ops)
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        if hasattr(limiter, "close"):
+            limiter.close()
+        print(f"  {name:<7} {rate:9.0f} logins/s  p50 {p50 * 1e6:7.1f} us  p99 {p99 * 1e6:8.1f} us"
+              f"  in-process state {mem / 1e6:6.2f} MB")
+
+    # Fresh interpreters: a forked child must not inherit an open SQLite connection
+    ctx = multiprocessing.get_context("spawn")
+    path = os.path.join(tmp, "procs.sqlite3")
+    SQLiteRateLimiter(path).close()
+    with ctx.Pool(procs) as pool:
+        started = time.perf_counter()
+        pool.map(_proc_worker, [(path, threads, ops // procs, i) for i in range(procs)])
+        elapsed = time.perf_counter() - started
+    print(f"  sqlite  {ops / elapsed:9.0f} logins/s  across {procs} processes x {threads} threads")
+
+    path = os.path.join(tmp, "shared.sqlite3")
+    SQLiteRateLimiter(path).close()
+    with ctx.Pool(procs) as pool:
+        allowed = sum(pool.map(_proc_same_key, [(path, 100)] * procs))
+    print(f"shared limit: {procs} processes x 100 attempts on one key, limit 50 -> {allowed} allowed")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--ops", type=int, default=20000)
+    ap.add_argument("--procs", type=int, default=4)
+    args = ap.parse_args()
+    run(args.threads, args.ops, args.procs)
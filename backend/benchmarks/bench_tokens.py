@@ -0,0 +1,56 @@
+"""Benchmark: token verification on hot authenticated routes.
+
+Run from backend/:  python benchmarks/bench_tokens.py [--tokens 500] [--requests 200000]
+
+Requests draw from a small set of live tokens, as EmulatorJS does when it fetches
+a ROM and its assets with one token. Compared: a full jwt.decode per request and
+TokenVerifier (digest LRU plus revocation check).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_cache import RevocationTable, TokenVerifier  # noqa: E402
+
+SECRET = "bench-secret"
+
+
+def run(tokens: int, requests: int):
+    now = time.time()
+    pool = [jwt.encode({"sub": f"user{i}", "iat": now, "exp": now + 86400}, SECRET, algorithm="HS256")
+            for i in range(tokens)]
+    rng = random.Random(1)
+    stream = [rng.choice(pool) for _ in range(requests)]
+
+    t = time.perf_counter()
+    for tok in stream:
+        jwt.decode(tok, SECRET, algorithms=["HS256"])
+    decode = (time.perf_counter() - t) / requests
+
+    revocations = RevocationTable(os.path.join(tempfile.mkdtemp(), "revocations.sqlite3"), 86400)
+    for i in range(0, tokens, 10):
+        revocations.revoke(f"other{i}")
+    verifier = TokenVerifier(SECRET, "HS256", revocations)
+    t = time.perf_counter()
+    for tok in stream:
+        verifier.verify(tok)
+    cached = (time.perf_counter() - t) / requests
+
+    print(f"{tokens} live tokens, {requests} requests")
+    print(f"  jwt.decode     {decode * 1e6:6.2f} us/request")
+    print(f"  TokenVerifier  {cached * 1e6:6.2f} us/request  ({verifier.hits} hits, {verifier.misses} misses)")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tokens", type=int, default=500)
+    ap.add_argument("--requests", type=int, default=200000)
+    args = ap.parse_args()
+    run(args.tokens, args.requests)
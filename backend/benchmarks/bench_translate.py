@@ -0,0 +1,100 @@
+"""Benchmark: per-string vs batched translation against a local stub provider.
+
+Run from backend/:  python benchmarks/bench_translate.py [--texts 500] [--latency 0.04]
+
+The stub answers MyMemory-style GETs and LibreTranslate-style POSTs (string or array
+q) after a fixed latency plus a small per-item cost. "before" replays the previous
+algorithm (MyMemory per string in fixed gathers of 20); "after" calls the app's
+_translate_upstream. Reports outbound request count and wall time for each.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmp = tempfile.mkdtemp(prefix="bench-translate-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/db.sqlite3")
+os.environ["TRANSLATION_CACHE"] = "0"
+
+import main  # noqa: E402
+from provider_health import ProviderHealth  # noqa: E402
+from translation_batch import AdaptiveConcurrency  # noqa: E402
+
+
+class StubProvider:
+    def __init__(self, latency: float, per_item: float):
+        self.latency = latency
+        self.per_item = per_item
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if request.url.host == "api.mymemory.translated.net":
+            await asyncio.sleep(self.latency + self.per_item)
+            q = request.url.params.get("q", "")
+            return httpx.Response(200, json={"responseStatus": 200, "responseData": {"translatedText": q.upper()}})
+        if request.url.path.endswith("/translate"):
+            q = json.loads(request.content or b"{}").get("q")
+            items = q if isinstance(q, list) else [q]
+            await asyncio.sleep(self.latency + self.per_item * len(items))
+            out = [str(x).upper() for x in items]
+            return httpx.Response(200, json={"translatedText": out if isinstance(q, list) else out[0]})
+        return httpx.Response(404)
+
+
+async def before(client: httpx.AsyncClient, texts):
+    async def one(t):
+        r = await client.get(
+            "https://api.mymemory.translated.net/get",
+            params={"q": t, "langpair": "en|de", "de": ""},
+        )
+        return (r.json().get("responseData") or {}).get("translatedText")
+    out = []
+    step = 20
+    for i in range(0, len(texts), step):
+        out.extend(await asyncio.gather(*[one(t) for t in texts[i:i + step]]))
+    return out
+
+
+async def after(texts):
+    req = main.TranslateRequest(texts=texts, source="en", target="de")
+    return await main._translate_upstream(req, texts)
+
+
+async def run(n: int, latency: float, per_item: float):
+    texts = [f"Homepage string number {i} with some typical length" for i in range(n)]
+    rows = []
+    for label in ("before", "after"):
+        stub = StubProvider(latency, per_item)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+        main._HTTP_CLIENT = client
+        main.PROVIDER_HEALTH = ProviderHealth()
+        main.TRANSLATE_CONCURRENCY = AdaptiveConcurrency(initial=8, minimum=2, maximum=32)
+        started = time.perf_counter()
+        if label == "before":
+            res = await before(client, texts)
+            translated = sum(1 for r in res if r)
+        else:
+            translated = len(await after(texts))
+        wall = time.perf_counter() - started
+        await client.aclose()
+        rows.append((label, stub.requests, wall, translated))
+    print(f"{n} texts, stub latency {latency * 1000:.0f} ms + {per_item * 1000:.1f} ms/item")
+    print(f"{'mode':<8}{'requests':>10}{'wall (s)':>12}{'translated':>12}")
+    for label, reqs, wall, translated in rows:
+        print(f"{label:<8}{reqs:>10}{wall:>12.3f}{translated:>12}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--texts", type=int, default=500)
+    ap.add_argument("--latency", type=float, default=0.04)
+    ap.add_argument("--per-item", type=float, default=0.0005)
+    args = ap.parse_args()
+    asyncio.run(run(args.texts, args.latency, args.per_item))
@@ -0,0 +1,86 @@
+"""Benchmark: login latency with a large users table.
+
+Run from backend/:  python benchmarks/bench_user_lookup.py [--users 100000] [--logins 200]
+
+Builds a throwaway SQLite database with the app's schema and N users, then times
+POST /api/token end to end (bcrypt cost 4, so the lookup is what is measured)
+and the user lookup alone, first with the lower(username) / lower(email)
+expression indexes and then with them dropped, which is how every
+case-insensitive lookup ran before.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "Bench-passw0rd"
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _measure(main, client, names, logins):
+    rng = random.Random(7)
+    login, lookup = [], []
+    db = main.SessionLocal()
+    try:
+        for _ in range(logins):
+            name = rng.choice(names)
+            t = time.perf_counter()
+            main._user_by_username(db, name.upper())
+            lookup.append(time.perf_counter() - t)
+            main.RATE_LIMITER.reset("login_ip:testclient")
+            t = time.perf_counter()
+            r = client.post("/api/token", data={"username": name, "password": PASSWORD})
+            login.append(time.perf_counter() - t)
+            assert r.status_code == 200, r.text
+    finally:
+        db.close()
+    return _pct(lookup, 0.5), _pct(login, 0.5), _pct(login, 0.99)
+
+
+def run(users: int, logins: int):
+    tmp = tempfile.mkdtemp(prefix="bench-users-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/users.sqlite3"
+    os.environ["RATE_LIMIT_BACKEND"] = "memory"
+    os.environ["BCRYPT_ROUNDS"] = "4"
+    import bcrypt
+    import main
+    from fastapi.testclient import TestClient
+
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)).decode()
+    names = [f"User{i:06d}" for i in range(users)]
+    raw = main.engine.raw_connection()
+    try:
+        raw.cursor().executemany(
+            "INSERT INTO users (username, hashed_password, email, is_verified, is_approved, failed_count, locked_until, role)"
+            " VALUES (?, ?, ?, 1, 1, 0, 0, 'user')",
+            [(n, hashed, f"{n}@example.com") for n in names],
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+    print(f"{users} users, {logins} logins")
+    with TestClient(main.app) as client:
+        for label in ("indexed", "full scan"):
+            if label == "full scan":
+                with main.engine.begin() as conn:
+                    conn.exec_driver_sql("DROP INDEX ix_users_username_lower")
+                    conn.exec_driver_sql("DROP INDEX ix_users_email_lower")
+            lookup, p50, p99 = _measure(main, client, names, logins)
+            print(f"  {label:<9}  lookup p50 {lookup * 1e3:7.3f} ms   login p50 {p50 * 1e3:7.2f} ms  p99 {p99 * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=100000)
+    ap.add_argument("--logins", type=int, default=200)
+    args = ap.parse_args()
+    run(args.users, args.logins)
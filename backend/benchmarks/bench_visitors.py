@@ -0,0 +1,53 @@
+"""Benchmark: visitor tracker memory and ping cost under a flood of distinct IPs.
+
+Run from backend/:  python benchmarks/bench_visitors.py [--per-minute 100000] [--minutes 5]
+
+Simulated time advances evenly through each minute and the sweeper runs every 2
+simulated seconds, as in the app. Memory is reported per simulated minute; it should
+level off at the capacity bound instead of growing with the number of IPs seen.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visitor_tracker import VisitorTracker  # noqa: E402
+
+UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def run(per_minute: int, minutes: int, capacity: int):
+    tracker = VisitorTracker(capacity=capacity, ttl=30)
+    tracemalloc.start()
+    clock = 1_000_000.0
+    step = 60.0 / per_minute
+    next_sweep = clock + 2
+    n = 0
+    spent = 0.0
+    for minute in range(1, minutes + 1):
+        for _ in range(per_minute):
+            n += 1
+            ip = f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}" if n < 1 << 24 else f"fd00::{n:x}"
+            t = time.perf_counter()
+            tracker.ping(ip, UA, "L", clock)
+            spent += time.perf_counter() - t
+            clock += step
+            if clock >= next_sweep:
+                tracker.sweep(clock)
+                next_sweep += 2
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"minute {minute}: {n:>8} IPs seen, {len(tracker):>6} tracked, "
+              f"{tracker.evicted:>8} evicted, {current / 1e6:7.1f} MB now, {peak / 1e6:7.1f} MB peak")
+    print(f"ping: {spent / n * 1e6:.2f} us average")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--per-minute", type=int, default=100000)
+    ap.add_argument("--minutes", type=int, default=5)
+    ap.add_argument("--capacity", type=int, default=50000)
+    args = ap.parse_args()
+    run(args.per_minute, args.minutes, args.capacity)
@@ -0,0 +1,79 @@
+"""Minimal parser for bsnes BML (markup) database files.
+
+Supports the subset used by the bundled databases: indentation-based nesting,
+"name: value" / "name:value" nodes, inline attributes ("cartridge sha256:..." or
+"database revision=..."), and "//" comment lines.
+"""
+from typing import Iterator, List, Optional
+
+
+class Node:
+    __slots__ = ("name", "value", "children")
+
+    def __init__(self, name: str, value: str = ""):
+        self.name = name
+        self.value = value
+        self.children: List["Node"] = []
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        for c in self.children:
+            if c.name == name:
+                return c.value
+        return default
+
+    def find(self, name: str) -> Iterator["Node"]:
+        return (c for c in self.children if c.name == name)
+
+
+def _parse_line(text: str) -> Node:
+    head, sep, rest = text.partition(" ")
+    colon = head.find(":")
+    equals = head.find("=")
+    if colon != -1 and (equals == -1 or colon < equals):
+        # name:value runs to the end of the line
+        name, _, value = text.partition(":")
+        return Node(name.strip(), value.strip())
+    if equals != -1:
+        name, _, value = head.partition("=")
+        node = Node(name, value.strip('"'))
+    else:
+        node = Node(head)
+    for attr in rest.split():
+        if ":" in attr:
+            k, _, v = attr.partition(":")
+        else:
+            k, _, v = attr.partition("=")
+        node.children.append(Node(k, v.strip('"')))
+    return node
+
+
+def parse(lines) -> Iterator[Node]:
+    """Yield top-level nodes from an iterable of lines, one at a time."""
+    root: Optional[Node] = None
+    stack: List[tuple] = []  # (indent, node)
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        stripped = line.lstrip(" \t")
+        if not stripped or stripped.startswith("//"):
+            continue
+        indent = len(line) - len(stripped)
+        node = _parse_line(stripped)
+        if indent == 0:
+            if root is not None:
+                yield root
+            root = node
+            stack = [(0, node)]
+            continue
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if not stack:
+            continue
+        stack[-1][1].children.append(node)
+        stack.append((indent, node))
+    if root is not None:
+        yield root
+
+
+def parse_file(path: str) -> Iterator[Node]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from parse(f)
@@ -0,0 +1,120 @@
+"""Database engines for the app DB: SQLite tuning, pooling and read/write split.
+
+SQLite in its default rollback-journal mode lets one writer block every
+reader. Each pooled connection is set up on connect with:
+- journal_mode=WAL: readers see the last committed snapshot and never wait
+  for the writer (and the writer never waits for readers)
+- synchronous=NORMAL: WAL is fsynced at checkpoints, not on every commit; a
+  power cut can lose the last commits but never corrupts the file
+- mmap_size / cache_size: reads served from the page cache and mapped file
+- busy_timeout: a second writer waits for the lock instead of failing with
+  "database is locked" at once
+
+Two engines share the file: the write engine for request sessions that may
+change data, and a read engine whose connections are opened query_only, for
+endpoints that only read. Both pools are sized to the request threadpool
+(40 threads by default) so a burst of requests does not queue for a
+connection. Other backends (e.g. Postgres) get the same pool sizing with
+pre-ping, and the read engine may point at a replica.
+
+Async endpoints use create_async_app_engine, the same setup on an asyncio
+driver (aiosqlite, or asyncpg for Postgres URLs), so their queries never run
+on the event loop thread.
+"""
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+# Sync driver -> asyncio driver, picked from the DATABASE_URL backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def data_dir(url: str) -> str:
+    """Directory for the app's auxiliary files: beside the SQLite DB, or ./data for other backends."""
+    if url.startswith("sqlite:///") and _is_sqlite_file(url):
+        return os.path.dirname(url[len("sqlite:///"):]) or "."
+    return "./data"
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url.split(":", 1)[1].strip("/") != ""
+
+
+def create_app_engine(
+    url: str,
+    read_only: bool = False,
+    pool_size: int = 8,
+    max_overflow: int = 32,
+    busy_timeout_ms: int = 5000,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_kib: int = 16 * 1024,
+) -> Engine:
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+    if not _is_sqlite_file(url):
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": busy_timeout_ms / 1000},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    _install_pragmas(engine, read_only, busy_timeout_ms, mmap_size, cache_kib)
+    return engine
+
+
+def async_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (postgres:// is accepted too)."""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    u = make_url(url)
+    driver = ASYNC_DRIVERS.get(u.get_backend_name())
+    if driver is None or u.get_driver_name() == driver:
+        return url
+    return u.set(drivername=f"{u.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def create_async_app_engine(
+    url: str,
+    read_only: bool = False,
+    pool_size: int = 8,
+    max_overflow: int = 32,
+    busy_timeout_ms: int = 5000,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_kib: int = 16 * 1024,
+) -> AsyncEngine:
+    url = async_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+    if not _is_sqlite_file(url):
+        return create_async_engine(url)
+
+    engine = create_async_engine(
+        url,
+        connect_args={"timeout": busy_timeout_ms / 1000},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    # Pool events fire on the sync facade; the adapted cursor runs each PRAGMA on the driver's thread
+    _install_pragmas(engine.sync_engine, read_only, busy_timeout_ms, mmap_size, cache_kib)
+    return engine
+
+
+def _install_pragmas(engine: Engine, read_only: bool, busy_timeout_ms: int, mmap_size: int, cache_kib: int) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            cur.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            cur.execute(f"PRAGMA cache_size={-int(cache_kib)}")  # negative: KiB, not pages
+            if read_only:
+                cur.execute("PRAGMA query_only=ON")
+        finally:
+            cur.close()
+
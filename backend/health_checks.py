@@ -0,0 +1,132 @@
+"""Concurrent TCP port and HTTP health probes with a short-lived result cache.
+
+Every probe goes through one shared semaphore, so batches from any number of
+requests never open more than max_concurrency sockets at once. Results are cached
+for ttl seconds per target, and a probe already in flight is shared by everyone who
+asks for the same target meanwhile, so a sweep costs as long as its slowest probe.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+
+def parse_target(target: str) -> Tuple[str, str, Optional[int]]:
+    """Split "host:port", "[v6]:port" or an http(s) URL into (kind, host, port).
+
+    Raises ValueError for anything else.
+    """
+    target = (target or "").strip()
+    if "://" in target:
+        parsed = urlparse(target)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("unsupported scheme")
+        return "http", parsed.hostname.lower(), parsed.port
+    host, sep, port = target.rpartition(":")
+    if not sep or not host or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError("expected host:port or an http(s) URL")
+    return "port", host.strip("[]").lower(), int(port)
+
+
+class HealthProber:
+    def __init__(
+        self,
+        client: Callable[[], httpx.AsyncClient],
+        allowed_hosts: Iterable[str],
+        max_concurrency: int = 32,
+        ttl: float = 5.0,
+    ):
+        self._client = client
+        self.allowed_hosts = set(allowed_hosts)
+        self.ttl = ttl
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._max_concurrency = max_concurrency
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self._max_concurrency)
+        return self._limit
+
+    async def _tcp(self, host: str, port: int, timeout: float) -> dict:
+        async with self._semaphore():
+            started = time.perf_counter()
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            except (OSError, OverflowError, ValueError, asyncio.TimeoutError) as e:
+                return {"open": False, "error": type(e).__name__}
+            latency = (time.perf_counter() - started) * 1000
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+            return {"open": True, "latency_ms": round(latency, 2)}
+
+    async def _http(self, url: str, timeout: float) -> dict:
+        async with self._semaphore():
+            started = time.perf_counter()
+            try:
+                r = await self._client().get(url, timeout=timeout, follow_redirects=True)
+            except httpx.HTTPError as e:
+                return {"ok": False, "error": str(e) or type(e).__name__}
+            latency = (time.perf_counter() - started) * 1000
+            return {"status_code": r.status_code, "ok": r.is_success, "latency_ms": round(latency, 2)}
+
+    async def _run(self, key: str, probe) -> dict:
+        try:
+            result = await probe()
+            self._cache[key] = (time.monotonic() + self.ttl, result)
+            if len(self._cache) > 4096:
+                now = time.monotonic()
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _cached(self, key: str, probe) -> dict:
+        hit = self._cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return dict(hit[1], cached=True)
+        fut = self._inflight.get(key)
+        shared = fut is not None
+        if fut is None:
+            # A task of its own, so a caller that disconnects does not cancel it for the others
+            fut = self._inflight[key] = asyncio.ensure_future(self._run(key, probe))
+        return dict(await asyncio.shield(fut), cached=shared)
+
+    async def port(self, host: str, port: int, timeout: float = 0.5) -> dict:
+        result = {"host": host, "port": port}
+        if host.lower() not in self.allowed_hosts:
+            return dict(result, open=False, error="host not allowed")
+        result.update(await self._cached(f"tcp {host.lower()} {port}", lambda: self._tcp(host, port, timeout)))
+        return result
+
+    async def http(self, url: str, timeout: float = 2.5) -> dict:
+        result = {"url": url}
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return dict(result, ok=False, error="unsupported scheme")
+        if (parsed.hostname or "").lower() not in self.allowed_hosts:
+            return dict(result, ok=False, error="host not allowed")
+        result.update(await self._cached(f"http {url}", lambda: self._http(url, timeout)))
+        return result
+
+    async def check(self, target: str, timeout: float) -> dict:
+        try:
+            kind, host, port = parse_target(target)
+        except ValueError as e:
+            return {"target": target, "ok": False, "error": str(e)}
+        if kind == "http":
+            result = await self.http(target.strip(), timeout)
+        else:
+            result = await self.port(host, port, timeout)
+            result["ok"] = result.get("open", False)
+        return dict(result, target=target, kind=kind)
+
+    async def batch(self, targets: List[str], timeout: float) -> List[dict]:
+        """Probe all targets concurrently; results keep the input order."""
+        return list(await asyncio.gather(*(self.check(t, timeout) for t in targets)))
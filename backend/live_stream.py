@@ -0,0 +1,165 @@
+"""Server-sent events fan-out for the live dashboard.
+
+One producer task collects a snapshot of every section at a fixed cadence, diffs it
+against the previous one and encodes the change once as a JSON merge patch (RFC 7386:
+changed keys only, null for a removed key). The same encoded frame is queued to every
+subscriber, so the work per tick does not grow with the number of open dashboards.
+
+New subscribers first receive the full snapshot. Each subscriber has a small bounded
+queue; one that falls behind by a full queue is dropped instead of buffering without
+limit, and its EventSource reconnects to a fresh snapshot. Nothing is collected while
+nobody is subscribed.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+
+def merge_patch(old: dict, new: dict) -> dict:
+    """Smallest merge patch turning old into new (dicts recurse, anything else is replaced).
+
+    As in RFC 7386, a key whose value becomes None is sent as null, which clients
+    treat the same as a removed key.
+    """
+    patch = {}
+    for k, v in new.items():
+        if k not in old:
+            patch[k] = v
+        elif isinstance(v, dict) and isinstance(old[k], dict):
+            sub = merge_patch(old[k], v)
+            if sub:
+                patch[k] = sub
+        elif v != old[k]:
+            patch[k] = v
+    for k in old:
+        if k not in new:
+            patch[k] = None
+    return patch
+
+
+def _frame(event: str, seq: int, data) -> bytes:
+    body = json.dumps(data, separators=(",", ":"), default=str)
+    return f"id: {seq}\nevent: {event}\ndata: {body}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+
+class LiveHub:
+    def __init__(
+        self,
+        sections: Dict[str, Callable[[], object]],
+        interval: float = 2.0,
+        queue_size: int = 8,
+        keepalive: float = 15.0,
+        retry_ms: int = 3000,
+    ):
+        self.sections = sections
+        self.interval = interval
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.retry_ms = retry_ms
+        self._subscribers: Set[Subscriber] = set()
+        self._wake = asyncio.Event()
+        self._state: Optional[dict] = None
+        self._snapshot_frame: Optional[bytes] = None
+        self._seq = 0
+        self.dropped_total = 0
+
+    def collect(self) -> dict:
+        """Build the current state of every section; a failing section keeps its last value."""
+        state = {}
+        for name, fn in self.sections.items():
+            try:
+                state[name] = fn()
+            except Exception as e:
+                logging.error(f"Live stream section {name} failed: {e}")
+                if self._state and name in self._state:
+                    state[name] = self._state[name]
+        return state
+
+    def _publish(self, state: dict) -> None:
+        previous, self._state = self._state, state
+        self._seq += 1
+        self._snapshot_frame = None
+        if previous is None:
+            frame = self._snapshot_frame = _frame("snapshot", self._seq, state)
+        else:
+            patch = merge_patch(previous, state)
+            if not patch:
+                return
+            frame = _frame("patch", self._seq, patch)
+        for sub in list(self._subscribers):
+            self._offer(sub, frame)
+
+    def _offer(self, sub: Subscriber, frame: bytes) -> None:
+        try:
+            sub.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._drop(sub)
+
+    def _drop(self, sub: Subscriber) -> None:
+        # Too far behind: discard its backlog and end its stream
+        self._subscribers.discard(sub)
+        sub.dropped = True
+        self.dropped_total += 1
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    def snapshot_frame(self) -> Optional[bytes]:
+        if self._state is None:
+            return None
+        if self._snapshot_frame is None:
+            self._snapshot_frame = _frame("snapshot", self._seq, self._state)
+        return self._snapshot_frame
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def run(self) -> None:
+        while True:
+            if not self._subscribers:
+                # Idle: forget the state so the next subscriber starts from a fresh snapshot
+                self._state = None
+                self._snapshot_frame = None
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            started = time.monotonic()
+            try:
+                state = await asyncio.to_thread(self.collect)
+                self._publish(state)
+            except Exception as e:
+                logging.error(f"Live stream tick failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        sub = Subscriber(self.queue_size)
+        # Take the snapshot and join in one step, so the first queued patch applies to it
+        frame = self.snapshot_frame()
+        self._subscribers.add(sub)
+        self._wake.set()
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode("ascii")
+            if frame is not None:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self._subscribers.discard(sub)
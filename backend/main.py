@@ -1,36 +1,65 @@
 import jwt
 from datetime import datetime, timedelta
-from fastapi import FastAPI, Depends, HTTPException, status, Body, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, status, Body
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy import Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-import bcrypt
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 import logging
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 import os
 from fastapi.requests import Request
 from fastapi.exceptions import RequestValidationError as FastAPIRequestValidationError
 from typing import Optional, List
+from functools import lru_cache
 from dotenv import load_dotenv
 from sqlalchemy import func
 import json
 from uuid import uuid4
 from fastapi.staticfiles import StaticFiles
-import psutil
-import socket
 import httpx
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
 from fastapi import Request as FastAPIRequest
 import smtplib
 from email.message import EmailMessage
 import asyncio
 import time
+from threading import Lock
+import hashlib
+from collections import OrderedDict
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+import importlib.util
+import translation_cache
+import rate_limit
+import db_config
+from provider_health import ProviderHealth
+from translation_batch import AdaptiveConcurrency, pack_batches
+from metrics_sampler import MetricsSampler
+from process_tracker import ProcessTracker
+from health_checks import HealthProber
+from mesh import MeshTopology
+from password_hashing import HasherBusy, PasswordHasher
+from token_cache import RevocationTable, TokenVerifier
+from visitor_tracker import VisitorTracker
+from visitor_history import VisitorHistory
+from audit_log import AuditWriter
+from live_stream import LiveHub
+from resumable_uploads import OffsetMismatch, QuotaExceeded, SessionBusy, SessionGone, UploadSessionStore
+from rom_catalog import RomCatalog
+from rom_database import RomDatabase
+from rom_identify import RomIndexer
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/db.sqlite3")
+# Auxiliary SQLite files (caches, compiled indexes) live next to the app DB
+DATA_DIR = db_config.data_dir(DATABASE_URL)
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
@@ -43,8 +72,21 @@ ALLOWED_CHECK_HOSTS = set(
 )
 
 print(f"Using DATABASE_URL: {DATABASE_URL}")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# WAL, pooled connections and a query_only engine for read endpoints (see db_config)
+_DB_TUNING = dict(
+    pool_size=int(os.getenv("DB_POOL_SIZE", "8")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "32")),
+    busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    cache_kib=int(os.getenv("SQLITE_CACHE_KIB", str(16 * 1024))),
+)
+engine = db_config.create_app_engine(DATABASE_URL, **_DB_TUNING)
+read_engine = db_config.create_app_engine(os.getenv("DATABASE_READ_URL") or DATABASE_URL, read_only=True, **_DB_TUNING)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+# Same database for async def endpoints, on aiosqlite / asyncpg so queries never block the loop
+async_engine = db_config.create_async_app_engine(DATABASE_URL, **_DB_TUNING)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 class User(Base):
@@ -59,12 +101,24 @@ class User(Base):
     locked_until = Column(Integer, default=0)  # epoch seconds
     role = Column(String, default="user")  # user, moderator, admin
 
+    # Lookups are case-insensitive; these let lower(username) = ? use an index
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username)),
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
 class Page(Base):
     __tablename__ = "pages"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     content = Column(String)
 
+class PageVersion(Base):
+    # Single row bumped on every page write, so each worker's page cache can tell it is stale
+    __tablename__ = "page_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 class EmailToken(Base):
     __tablename__ = "email_tokens"
     id = Column(Integer, primary_key=True)
@@ -126,6 +180,8 @@ def _run_sqlite_migrations_if_needed():
         # Add indexes (safe idempotent creation)
         cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users(username)")
         cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users(email)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_users_username_lower ON users(lower(username))")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_users_email_lower ON users(lower(email))")
         raw.commit()
     finally:
         raw.close()
@@ -153,12 +209,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Ensure uploads dir exists and mount it for static serving
+# Ensure uploads dir exists and mount its public subdirectories for static serving.
+# UPLOADS_DIR itself is not mounted: it also holds .staging (partial uploads), which
+# must stay private but on the same filesystem as media/ so finishing an upload is a rename.
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOADS_DIR = os.path.join(BASE_DIR, "uploads")
 MEDIA_DIR = os.path.join(UPLOADS_DIR, "media")
 os.makedirs(MEDIA_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
+app.mount("/uploads/media", StaticFiles(directory=MEDIA_DIR), name="uploads-media")
 
 # Email settings
 SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
@@ -171,6 +229,7 @@ MAIL_DEV = os.getenv("MAIL_DEV", "0") == "1"
 MAILBOX_DIR = os.path.join(UPLOADS_DIR, "mailbox")
 if MAIL_DEV:
     os.makedirs(MAILBOX_DIR, exist_ok=True)
+    app.mount("/uploads/mailbox", StaticFiles(directory=MAILBOX_DIR), name="uploads-mailbox")
 
 def _send_email(subject: str, body: str, to: str) -> None:
     msg = EmailMessage()
@@ -197,23 +256,49 @@ def _send_email(subject: str, body: str, to: str) -> None:
     except Exception as e:
         logging.error(f"Email send failed: {e}")
 
+# --- Shared outbound HTTP client ---
+# One pooled client for the app lifetime so captcha, translation and health checks
+# reuse keep-alive connections instead of paying TCP+TLS setup per call.
+# HTTP/2 is negotiated when the optional h2 package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+def _http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=15.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+        )
+    return _HTTP_CLIENT
+
+@app.on_event("shutdown")
+async def close_http_client():
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
 async def _verify_captcha(token: Optional[str], ip: str) -> bool:
     if not token:
         return not (TURNSTILE_SECRET or HCAPTCHA_SECRET)
     try:
-        async with httpx.AsyncClient(timeout=6.0) as client:
-            if TURNSTILE_SECRET:
-                r = await client.post(
-                    "https://challenges.cloudflare.com/turnstile/v0/siteverify",
-                    data={"secret": TURNSTILE_SECRET, "response": token, "remoteip": ip},
-                )
-                return r.json().get("success") is True
-            if HCAPTCHA_SECRET:
-                r = await client.post(
-                    "https://hcaptcha.com/siteverify",
-                    data={"secret": HCAPTCHA_SECRET, "response": token, "remoteip": ip},
-                )
-                return r.json().get("success") is True
+        client = _http_client()
+        if TURNSTILE_SECRET:
+            r = await client.post(
+                "https://challenges.cloudflare.com/turnstile/v0/siteverify",
+                data={"secret": TURNSTILE_SECRET, "response": token, "remoteip": ip},
+                timeout=6.0,
+            )
+            return r.json().get("success") is True
+        if HCAPTCHA_SECRET:
+            r = await client.post(
+                "https://hcaptcha.com/siteverify",
+                data={"secret": HCAPTCHA_SECRET, "response": token, "remoteip": ip},
+                timeout=6.0,
+            )
+            return r.json().get("success") is True
     except Exception:
         pass
     return False if (TURNSTILE_SECRET or HCAPTCHA_SECRET) else True
@@ -221,17 +306,40 @@ async def _verify_captcha(token: Optional[str], ip: str) -> bool:
 def _epoch_now() -> int:
     return int(time.time())
 
-def _audit(db: Session, event: str, username: Optional[str], ip: Optional[str], extra: Optional[str] = None):
-    try:
-        db.add(AuditLog(event=event, username=username, ip=ip, extra=extra))
-        db.commit()
-    except Exception:
-        db.rollback()
+# Audit rows are queued and bulk-inserted by a background task (see audit_log)
+AUDIT_LOG = AuditWriter(
+    async_engine,
+    AuditLog.__table__,
+    max_queue=int(os.getenv("AUDIT_QUEUE_MAX", "10000")),
+    batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "500")),
+    interval=float(os.getenv("AUDIT_FLUSH_MS", "250")) / 1000,
+)
+
+def _audit(event: str, username: Optional[str], ip: Optional[str], extra: Optional[str] = None):
+    AUDIT_LOG.record(event, username, ip, extra)
+
+@app.on_event("startup")
+async def start_audit_writer():
+    app.state.audit_writer = asyncio.create_task(AUDIT_LOG.run())
+
+@app.on_event("shutdown")
+async def flush_audit_log():
+    await AUDIT_LOG.flush()
+    if AUDIT_LOG.dropped:
+        logging.error(f"Audit log: {AUDIT_LOG.dropped} rows dropped since start")
 
 # LibreTranslate settings
 LT_URL = os.getenv("LT_URL", "https://libretranslate.com")
 LT_API_KEY = os.getenv("LT_API_KEY")
 MT_EMAIL = os.getenv("MT_EMAIL", MAIL_TO)
+# Persistent translation memory (SQLite file next to the app DB); None when disabled
+TRANSLATION_CACHE = translation_cache.open_cache(DATA_DIR)
+# Circuit breaker + latency EWMA per upstream; MyMemory is tracked as "mymemory"
+PROVIDER_HEALTH = ProviderHealth()
+# Outbound translation pacing: array payload bounds and an AIMD in-flight cap
+TRANSLATE_BATCH_ITEMS = int(os.getenv("TRANSLATE_BATCH_ITEMS", "50"))
+TRANSLATE_BATCH_CHARS = int(os.getenv("TRANSLATE_BATCH_CHARS", "4000"))
+TRANSLATE_CONCURRENCY = AdaptiveConcurrency(initial=8, minimum=2, maximum=32)
 
 # --- Registration and security toggles ---
 REGISTRATION_OPEN = os.getenv("REGISTRATION_OPEN", "1") == "1"
@@ -243,34 +351,32 @@ REQUIRE_APPROVAL_FOR_LOGIN = os.getenv("REQUIRE_APPROVAL_FOR_LOGIN", "0") == "1"
 TURNSTILE_SECRET = os.getenv("TURNSTILE_SECRET")
 HCAPTCHA_SECRET = os.getenv("HCAPTCHA_SECRET")
 
-# Simple in-memory rate limits (restart resets). Consider Redis for multi-instance.
-from collections import deque
-from threading import Lock
-import time
-
-RL_LOCK = Lock()
-RATE_BUCKETS = {
-    "register_ip": {},   # key: ip -> deque[timestamps]
-    "login_ip": {},      # key: ip -> deque
-    "login_user": {},    # key: username -> deque
-}
+# Rate limits (see rate_limit): GCRA with one timestamp per key. The default SQLite
+# store is shared by every worker process using the same data directory.
 
-def _now() -> float:
-    return time.time()
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "sqlite")
+RATE_LIMITER = rate_limit.open_limiter(RATE_LIMIT_BACKEND, os.path.join(DATA_DIR, "ratelimit.sqlite3"))
 
 def _rate_check(bucket: str, key: str, limit: int, window_sec: int) -> tuple[bool, int]:
     # returns (allowed, retry_after_seconds)
-    now = _now()
-    with RL_LOCK:
-        q = RATE_BUCKETS[bucket].setdefault(key, deque())
-        # purge old
-        while q and (now - q[0]) > window_sec:
-            q.popleft()
-        if len(q) >= limit:
-            retry = max(1, int(window_sec - (now - q[0])))
-            return False, retry
-        q.append(now)
-        return True, 0
+    return RATE_LIMITER.hit(f"{bucket}:{key}", limit, window_sec)
+
+async def _rate_check_async(bucket: str, key: str, limit: int, window_sec: int) -> tuple[bool, int]:
+    # The SQLite store may wait on another worker's write lock; keep that off the loop
+    return await asyncio.to_thread(_rate_check, bucket, key, limit, window_sec)
+
+# Keys whose limit has fully recovered carry no state and are deleted
+async def _evict_rate_limits_forever(interval: float = 300.0):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(RATE_LIMITER.evict_idle)
+        except Exception as e:
+            logging.error(f"Rate limit eviction failed: {e}")
+
+@app.on_event("startup")
+async def start_rate_limit_evictor():
+    app.state.rate_limit_evictor = asyncio.create_task(_evict_rate_limits_forever())
 
 # Use local path for logging in development, Docker path in production
 import os
@@ -289,27 +395,78 @@ def get_db():
     finally:
         db.close()
 
-def verify_password(plain_password, hashed_password):
-    # Use bcrypt directly instead of passlib to avoid the 72-byte bug
-    import bcrypt
+def get_read_db():
+    # For endpoints that never write; the connection rejects writes
+    db = ReadSessionLocal()
     try:
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
-    except Exception as e:
-        print(f"Password verification error: {e}")
-        return False
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    # For async def endpoints; a sync Session there would run its queries on the event loop
+    async with AsyncSessionLocal() as db:
+        yield db
 
-def get_password_hash(password):
-    # Use bcrypt directly instead of passlib to avoid the 72-byte bug
-    import bcrypt
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+# Case-insensitive user lookups, served by ix_users_username_lower / ix_users_email_lower
+def _user_by_username(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(func.lower(User.username) == username.lower()).first()
+
+def _user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(func.lower(User.email) == email.lower()).first()
+
+async def _user_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+    return (await db.execute(select(User).where(func.lower(User.username) == username.lower()).limit(1))).scalars().first()
+
+async def _user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    return (await db.execute(select(User).where(func.lower(User.email) == email.lower()).limit(1))).scalars().first()
+
+# bcrypt runs in its own process pool (see password_hashing), never in a request thread
+PASSWORD_HASHER = PasswordHasher(
+    workers=int(os.getenv("HASH_WORKERS", "0")),
+    max_pending=int(os.getenv("HASH_MAX_PENDING", "0")),
+    rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+)
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, please retry shortly",
+        headers={"Retry-After": str(PASSWORD_HASHER.retry_after())},
+    )
+
+async def verify_password(plain_password: str, hashed_password: Optional[str]) -> tuple[bool, bool]:
+    # returns (matches, needs_rehash)
+    try:
+        return await PASSWORD_HASHER.verify(plain_password, hashed_password)
+    except HasherBusy:
+        raise _hasher_busy()
+
+async def get_password_hash(password: str) -> str:
+    try:
+        return await PASSWORD_HASHER.hash(password)
+    except HasherBusy:
+        raise _hasher_busy()
+
+@app.on_event("shutdown")
+async def stop_password_hasher():
+    PASSWORD_HASHER.shutdown()
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    # iat to the millisecond, so a token issued right after a revocation is not caught by it
+    to_encode.update({"exp": expire, "iat": round(time.time(), 3)})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Verified tokens are cached until their exp; ban, delete and password changes revoke (see token_cache)
+TOKEN_REVOCATIONS = RevocationTable(os.path.join(DATA_DIR, "token_revocations.sqlite3"), ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+TOKEN_VERIFIER = TokenVerifier(SECRET_KEY, ALGORITHM, TOKEN_REVOCATIONS, capacity=int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+
 class RegisterRequest(BaseModel):
     username: str
     password: str
@@ -319,6 +476,8 @@ class RegisterRequest(BaseModel):
 
 # removed duplicate imports (Body already imported above, JSONResponse already imported at top)
 
+# Memoized: browsers send the same few user-agent strings on every ping
+@lru_cache(maxsize=4096)
 def _os_letter(user_agent: str) -> str:
     ua = (user_agent or "").lower()
     # Order matters: detect Chromebook first (CrOS)
@@ -348,12 +507,162 @@ def _client_ip_simple(request: FastAPIRequest) -> str:
     except Exception:
         return "0.0.0.0"
 
-VISITORS = {}
-VISITOR_LOCK = Lock()
+# Bounded in-memory visitor table (see visitor_tracker); expired by a background sweeper.
+# A visit ends after 30s without a ping and counts once it has lasted 10s.
+VISITOR_CAPACITY = int(os.getenv("VISITOR_CAPACITY", "50000"))
+VISITORS = VisitorTracker(capacity=VISITOR_CAPACITY, ttl=30, real_after=10)
+# Per-minute rollups for /api/visitors/history; pings are buffered and flushed in batches
+VISITOR_HISTORY_FLUSH = float(os.getenv("VISITOR_HISTORY_FLUSH", "15"))
+VISITOR_HISTORY = VisitorHistory(os.path.join(DATA_DIR, "visitor_history.sqlite3"))
 
 class PageContentRequest(BaseModel):
     content: str
 
+# --- Conditional JSON responses (strong ETag + If-None-Match) ---
+def _json_bytes(obj) -> bytes:
+    # Same encoding JSONResponse uses, so cached bodies match uncached ones byte for byte
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def _strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    if inm.strip() == "*":
+        return True
+    tag = etag[2:] if etag.startswith("W/") else etag
+    for cand in inm.split(","):
+        cand = cand.strip()
+        if cand.startswith("W/"):
+            cand = cand[2:]
+        if cand == tag:
+            return True
+    return False
+
+def _conditional_json(request: Request, body: bytes, etag: str, cache_control: str = "no-cache") -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _bump_page_version(db: Session) -> None:
+    # Part of the caller's transaction; commits together with the page write
+    if not db.execute(update(PageVersion).where(PageVersion.id == 1).values(version=PageVersion.version + 1)).rowcount:
+        db.add(PageVersion(id=1, version=1))
+
+# --- In-process page cache ---
+# Pages only change through save_page, so public reads are served from memory.
+# Every save bumps the version and drops the cached snapshot and encoded bodies;
+# a load that races with a save is simply not installed. The cache is per process:
+# other workers notice a save through the shared page_version row, read at most
+# every check_every seconds, so they serve stale pages for at most that long.
+class _PageCache:
+    def __init__(self, check_every: float = 1.0):
+        self.check_every = check_every
+        self._lock = Lock()
+        self._version = 0
+        self._pages: Optional[dict] = None  # name -> content
+        self._bodies: dict = {}  # key -> (body, etag)
+        self._shared: Optional[int] = None  # page_version the cached data was loaded under
+        self._checked_at = float("-inf")
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._pages = None
+            self._bodies = {}
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_every
+
+    def _sync(self, shared: Optional[int]) -> None:
+        # Read before any load it guards, so a snapshot is never labelled newer than its data
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if shared == self._shared:
+                return
+            self._shared = shared
+            self._version += 1
+            self._pages = None
+            self._bodies = {}
+
+    def _check(self) -> None:
+        if not self._due():
+            return
+        db = ReadSessionLocal()
+        try:
+            self._sync(db.execute(select(PageVersion.version).where(PageVersion.id == 1)).scalar())
+        finally:
+            db.close()
+
+    async def _check_async(self) -> None:
+        if not self._due():
+            return
+        async with AsyncSessionLocal() as db:
+            self._sync((await db.execute(select(PageVersion.version).where(PageVersion.id == 1))).scalar())
+
+    def _install(self, version: int, pages: dict) -> dict:
+        with self._lock:
+            if version == self._version and self._pages is None:
+                self._pages = pages
+        return pages
+
+    def pages(self) -> dict:
+        with self._lock:
+            if self._pages is not None:
+                return self._pages
+            version = self._version
+        db = ReadSessionLocal()
+        try:
+            pages = {p.name: p.content for p in db.query(Page).all()}
+        finally:
+            db.close()
+        return self._install(version, pages)
+
+    async def pages_async(self) -> dict:
+        with self._lock:
+            if self._pages is not None:
+                return self._pages
+            version = self._version
+        async with AsyncSessionLocal() as db:
+            pages = dict((await db.execute(select(Page.name, Page.content))).all())
+        return self._install(version, pages)
+
+    def _encode(self, key, version: int, obj) -> Optional[tuple]:
+        if obj is None:
+            return None
+        body = _json_bytes(obj)
+        entry = (body, _strong_etag(body))
+        with self._lock:
+            if version == self._version:
+                self._bodies[key] = entry
+        return entry
+
+    def body(self, key, build) -> Optional[tuple]:
+        """Return (body, etag) for key; build(pages) returns the object to encode, or None."""
+        self._check()
+        with self._lock:
+            hit = self._bodies.get(key)
+            version = self._version
+        if hit is not None:
+            return hit
+        return self._encode(key, version, build(self.pages()))
+
+    async def body_async(self, key, build) -> Optional[tuple]:
+        """body() for async endpoints: a miss loads pages without blocking the loop."""
+        await self._check_async()
+        with self._lock:
+            hit = self._bodies.get(key)
+            version = self._version
+        if hit is not None:
+            return hit
+        return self._encode(key, version, build(await self.pages_async()))
+
+PAGE_CACHE = _PageCache(check_every=float(os.getenv("PAGE_CACHE_CHECK", "1")))
+
 # Save or update a page
 
 @app.post("/api/pages/{name}")
@@ -364,23 +673,29 @@ def save_page(name: str, req: PageContentRequest = Body(...), db: Session = Depe
     else:
         page = Page(name=name, content=req.content)
         db.add(page)
+    _bump_page_version(db)
     db.commit()
+    PAGE_CACHE.invalidate()
     return {"msg": "Page saved"}
 
 # Get a page (public, no token required)
 @app.get("/api/pages/{name}")
-def get_page(name: str, db: Session = Depends(get_db)):
-    page = db.query(Page).filter(Page.name == name).first()
-    if not page:
+def get_page(name: str, request: Request):
+    def build(pages: dict):
+        if name not in pages:
+            return None
+        return {"name": name, "content": pages[name]}
+    entry = PAGE_CACHE.body(("api", name), build)
+    if entry is None:
         return JSONResponse(status_code=404, content={"detail": "Page not found"})
-    return {"name": page.name, "content": page.content}
+    return _conditional_json(request, *entry)
 
 # Get all pages (public, no token required)
 @app.get("/api/pages")
-def get_all_pages(db: Session = Depends(get_db)):
+def get_all_pages(request: Request):
     """Get list of all pages"""
-    pages = db.query(Page).all()
-    return [{"name": page.name, "content": page.content} for page in pages]
+    entry = PAGE_CACHE.body(("all",), lambda pages: [{"name": n, "content": c} for n, c in pages.items()])
+    return _conditional_json(request, *entry)
 
 class ContactRequest(BaseModel):
     name: str
@@ -465,90 +780,286 @@ async def translate(req: TranslateRequest):
         raise HTTPException(status_code=400, detail="target language is required")
     # Cap batch size to avoid abuse
     texts = req.texts[:500]
-    params_base = {"source": req.source or "auto", "target": req.target, "format": req.format or "text"}
-    if LT_API_KEY:
-        params_base["api_key"] = LT_API_KEY
-    providers = [LT_URL, "https://libretranslate.com", "https://libretranslate.de", "https://translate.astian.org", "https://lt.vern.cc"]
-    # dedupe while preserving order
-    seen = set()
-    providers = [p for p in providers if (p and not (p in seen or seen.add(p)))]
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        async def mymemory_one(t: str):
+    src_key = req.source or "auto"
+    fmt = req.format or "text"
+    # Collapse duplicates, then serve whatever the translation memory already knows
+    unique = list(dict.fromkeys(texts))
+    known = {}
+    if TRANSLATION_CACHE is not None:
+        try:
+            known = await asyncio.to_thread(TRANSLATION_CACHE.get_many, src_key, req.target, fmt, unique)
+        except Exception as e:
+            logging.error(f"Translation cache read failed: {e}")
+    pending = [t for t in unique if t not in known]
+    fresh = {}
+    if pending:
+        fresh = await _translate_upstream(req, pending)
+        if TRANSLATION_CACHE is not None and fresh:
             try:
-                q = t
-                # MyMemory often works better with shorter chunks
-                if len(q) > 1900:
-                    q = q[:1890] + "…"
-                params = {
-                    "q": q,
-                    "langpair": f"{(req.source or 'en')}|{req.target}",
-                    "de": MT_EMAIL or "",
-                }
-                r = await client.get("https://api.mymemory.translated.net/get", params=params)
-                r.raise_for_status()
-                jd = r.json()
-                out = (jd.get("responseData") or {}).get("translatedText")
-                if isinstance(out, str) and out:
-                    return out
-            except Exception:
-                pass
-            return None
-        async def do_one(t: str):
-            # Try MyMemory first
-            mm = await mymemory_one(t)
-            if isinstance(mm, str) and mm:
-                return mm
-            # Fallback to LibreTranslate providers
-            for base in providers:
-                data = params_base.copy()
-                data["q"] = t
-                try:
-                    r = await client.post(f"{base.rstrip('/')}/translate", data=data)
-                    r.raise_for_status()
-                    jd = r.json()
-                    return (jd.get("translatedText") or jd.get("translated_text") or t)
-                except Exception:
-                    continue
-            return t
-        # Run in small parallel batches to be polite
-        out: List[str] = []
-        step = 20
-        for i in range(0, len(texts), step):
-            chunk = texts[i:i+step]
-            res = await asyncio.gather(*[do_one(t) for t in chunk])
-            out.extend(res)
+                await asyncio.to_thread(TRANSLATION_CACHE.put_many, src_key, req.target, fmt, fresh)
+            except Exception as e:
+                logging.error(f"Translation cache write failed: {e}")
+    out: List[str] = [known[t] if t in known else fresh.get(t, t) for t in texts]
     try:
         changed = any((out[i] or "") != (texts[i] or "") for i in range(len(out)))
     except Exception:
         changed = None
     return {"translations": out, "changed": changed}
 
-# Media upload endpoint (video/audio); requires auth
-@app.post("/api/upload/media")
-def upload_media(file: UploadFile = File(...), token: str = Depends(oauth2_scheme)):
-    # Basic validation
-    content_type = (file.content_type or "").lower()
-    if not (content_type.startswith("video/") or content_type.startswith("audio/")):
-        raise HTTPException(status_code=400, detail="Only video/audio uploads are allowed")
+def _translate_providers() -> List[str]:
+    providers = [LT_URL, "https://libretranslate.com", "https://libretranslate.de", "https://translate.astian.org", "https://lt.vern.cc"]
+    # dedupe while preserving order
+    seen = set()
+    return [p for p in providers if (p and not (p in seen or seen.add(p)))]
+
+async def _upstream_json(name: str, send, valid) -> Optional[dict]:
+    # One outbound call under the shared concurrency cap, recorded against the provider's health.
+    # Returns the decoded JSON, or None if the provider is tripped, errors, or valid(jd) is False.
+    async with TRANSLATE_CONCURRENCY:
+        # Checked after queueing so calls waiting for a slot see a breaker that tripped meanwhile
+        if not PROVIDER_HEALTH.available(name):
+            return None
+        started = time.monotonic()
+        try:
+            r = await send()
+            r.raise_for_status()
+            jd = r.json()
+            ok = valid(jd)
+        except Exception:
+            jd, ok = None, False
+        latency = time.monotonic() - started
+    if not ok:
+        PROVIDER_HEALTH.record_failure(name, latency)
+        TRANSLATE_CONCURRENCY.failure()
+        return None
+    PROVIDER_HEALTH.record_success(name, latency)
+    TRANSLATE_CONCURRENCY.success()
+    return jd
+
+async def _mymemory_one(req: TranslateRequest, t: str) -> Optional[str]:
+    q = t
+    # MyMemory often works better with shorter chunks
+    if len(q) > 1900:
+        q = q[:1890] + "…"
+    params = {
+        "q": q,
+        "langpair": f"{(req.source or 'en')}|{req.target}",
+        "de": MT_EMAIL or "",
+    }
+    # Quota/limit notices come back as 200 with a warning as the "translation"
+    jd = await _upstream_json(
+        "mymemory",
+        lambda: _http_client().get("https://api.mymemory.translated.net/get", params=params),
+        lambda jd: str(jd.get("responseStatus", 200)) == "200",
+    )
+    out = ((jd or {}).get("responseData") or {}).get("translatedText")
+    return out if isinstance(out, str) and out else None
+
+async def _libre_translate(params_base: dict, q):
+    # q is a string or a list of strings; returns the matching translatedText or None
+    for base in PROVIDER_HEALTH.order(_translate_providers()):
+        data = dict(params_base, q=q)
+        jd = await _upstream_json(
+            base,
+            lambda: _http_client().post(f"{base.rstrip('/')}/translate", json=data),
+            lambda jd: isinstance(jd.get("translatedText"), type(q)) and (not isinstance(q, list) or len(jd["translatedText"]) == len(q)),
+        )
+        if jd is not None:
+            return jd["translatedText"]
+    return None
+
+async def _translate_each(req: TranslateRequest, params_base: dict, texts: List[str]) -> dict:
+    # Per-string path: MyMemory, then LibreTranslate one text at a time
+    async def do_one(t: str):
+        mm = await _mymemory_one(req, t)
+        if mm:
+            return mm
+        out = await _libre_translate(params_base, t)
+        return out if isinstance(out, str) and out else None
+    res = await asyncio.gather(*[do_one(t) for t in texts])
+    return {t: r for t, r in zip(texts, res) if r is not None}
+
+async def _translate_upstream(req: TranslateRequest, texts: List[str]) -> dict:
+    # Returns {text: translation} for the texts some provider actually translated.
+    # LibreTranslate takes array payloads, so texts go out in size-bounded batches first;
+    # only what no batch covered falls back to per-string calls.
+    params_base = {"source": req.source or "auto", "target": req.target, "format": req.format or "text"}
+    if LT_API_KEY:
+        params_base["api_key"] = LT_API_KEY
+    done = {}
+
+    async def run_batch(batch: List[str]):
+        out = await _libre_translate(params_base, batch)
+        for t, r in zip(batch, out or []):
+            if isinstance(r, str) and r:
+                done[t] = r
+
+    batches = pack_batches(texts, TRANSLATE_BATCH_ITEMS, TRANSLATE_BATCH_CHARS)
+    await asyncio.gather(*[run_batch(b) for b in batches])
+    missing = [t for t in texts if t not in done]
+    if missing:
+        done.update(await _translate_each(req, params_base, missing))
+    return done
+
+# --- Media storage ---
+# The multipart body is parsed as it arrives (not spooled by the framework first) and
+# the file part is written to a staging file in fixed-size chunks while the SHA-256 is
+# computed, then moved into MEDIA_DIR under its content-addressed name. Content that is
+# already stored is answered with the existing file instead of a second copy.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(1024 * 1024 * 1024)))  # 1 GiB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers allowed on top of MAX_UPLOAD_BYTES
+# Staged and partial uploads sit on the uploads volume beside MEDIA_DIR but outside the
+# served subdirectories (nginx denies /uploads/.staging/ too)
+STAGING_DIR = os.path.join(UPLOADS_DIR, ".staging")
+os.makedirs(STAGING_DIR, exist_ok=True)
+# Finishing an upload must be a rename, never a second full copy
+if os.stat(STAGING_DIR).st_dev != os.stat(MEDIA_DIR).st_dev:
+    raise RuntimeError(f"{STAGING_DIR} and {MEDIA_DIR} must be on the same filesystem")
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _media_content_type_ok(content_type: str) -> bool:
+    return content_type.startswith("video/") or content_type.startswith("audio/")
+
+def _write_staged(f, h, data: bytes) -> None:
+    h.update(data)
+    f.write(data)
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
 
-    # Generate a safe unique filename preserving extension
-    _, ext = os.path.splitext(file.filename or "")
+async def _stream_upload_to_staging(request: Request, field: str, limit: int) -> dict:
+    # Feed the request body to a push multipart parser; only the `field` file part is kept.
+    # Returns sha256/size/path/filename/content_type of the staged file. Raises 400 for a
+    # bad body or content type, 413 once the file grows past limit (partial file removed).
+    ctype, params = parse_options_header(request.headers.get("content-type", ""))
+    if ctype != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"File too large (max {limit} bytes)")
+
+    part = {"headers": {}, "name": bytearray(), "value": bytearray()}
+    found = {}
+    in_file = False
+    buf = bytearray()
+
+    def on_part_begin():
+        part["headers"] = {}
+
+    def on_header_field(data, start, end):
+        part["name"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][bytes(part["name"]).lower()] = bytes(part["value"])
+        part["name"].clear()
+        part["value"].clear()
+
+    def on_headers_finished():
+        nonlocal in_file
+        _, opts = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        if found or opts.get(b"name") != field.encode() or b"filename" not in opts:
+            return
+        content_type = part["headers"].get(b"content-type", b"").decode("latin-1").lower()
+        if not _media_content_type_ok(content_type):
+            raise HTTPException(status_code=400, detail="Only video/audio uploads are allowed")
+        found.update(filename=opts[b"filename"].decode("utf-8", "replace"), content_type=content_type, size=0)
+        in_file = True
+
+    def on_part_data(data, start, end):
+        if in_file:
+            found["size"] += end - start
+            if found["size"] > limit:
+                raise HTTPException(status_code=413, detail=f"File too large (max {limit} bytes)")
+            buf.extend(data[start:end])
+
+    def on_part_end():
+        nonlocal in_file
+        in_file = False
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    h = hashlib.sha256()
+    tmp_path = os.path.join(STAGING_DIR, f"{uuid4().hex}.part")
+    f = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        try:
+            try:
+                async for chunk in request.stream():
+                    parser.write(chunk)
+                    if len(buf) >= UPLOAD_CHUNK_SIZE:
+                        await asyncio.to_thread(_write_staged, f, h, bytes(buf))
+                        buf.clear()
+                parser.finalize()
+            except MultipartParseError:
+                raise HTTPException(status_code=400, detail="Malformed multipart body")
+            if buf:
+                await asyncio.to_thread(_write_staged, f, h, bytes(buf))
+        finally:
+            await asyncio.to_thread(f.close)
+        if not found:
+            raise HTTPException(status_code=400, detail=f"Missing '{field}' file part")
+    except BaseException:
+        await asyncio.to_thread(_unlink_quietly, tmp_path)
+        raise
+    return dict(found, sha256=h.hexdigest(), path=tmp_path)
+
+def _store_media(tmp_path: str, digest: str, ext: str) -> tuple:
+    # Move a staged file into MEDIA_DIR under its digest name, or drop it if that file
+    # already exists. Returns (filename, deduplicated).
+    safe_name = f"{digest}{ext}"
+    dest = os.path.join(MEDIA_DIR, safe_name)
+    if os.path.isfile(dest):
+        os.unlink(tmp_path)
+        return safe_name, True
+    os.replace(tmp_path, dest)  # same filesystem (checked at startup), so a rename
+    return safe_name, False
+
+def _media_ext(filename: Optional[str]) -> str:
+    # Preserve a short, lowercased extension from the client filename
+    _, ext = os.path.splitext(filename or "")
     ext = (ext or "").lower()
     if len(ext) > 10:
         ext = ext[:10]
-    safe_name = f"{uuid4().hex}{ext}"
-    dest_path = os.path.join(MEDIA_DIR, safe_name)
-    try:
-        with open(dest_path, "wb") as f:
-            f.write(file.file.read())
-    finally:
-        try:
-            file.file.close()
-        except Exception:
-            pass
+    return ext
+
+# Media upload endpoint (video/audio); requires auth
+@app.post("/api/upload/media")
+async def upload_media(request: Request, token: str = Depends(oauth2_scheme)):
+    # multipart/form-data with the media in a "file" part
+    staged = await _stream_upload_to_staging(request, "file", MAX_UPLOAD_BYTES)
+    safe_name, deduplicated = await asyncio.to_thread(
+        _store_media, staged["path"], staged["sha256"], _media_ext(staged["filename"])
+    )
 
     url = f"/uploads/media/{safe_name}"
-    return {"url": url, "filename": safe_name, "content_type": content_type}
+    return {
+        "url": url,
+        "filename": safe_name,
+        "content_type": staged["content_type"],
+        "size": staged["size"],
+        "sha256": staged["sha256"],
+        "deduplicated": deduplicated,
+    }
 
 # Simple health endpoint
 @app.get("/health")
@@ -559,7 +1070,7 @@ def health():
 
 def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = TOKEN_VERIFIER.verify(token)
         username = payload.get("sub")
         if not username:
             raise HTTPException(status_code=401, detail="Invalid token payload")
@@ -588,7 +1099,7 @@ def get_user_from_token_query(token: str = None, request: Request = None) -> str
         raise HTTPException(status_code=401, detail="No authentication token provided")
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = TOKEN_VERIFIER.verify(token)
         username = payload.get("sub")
         if not username:
             raise HTTPException(status_code=401, detail="Invalid token payload")
@@ -596,25 +1107,323 @@ def get_user_from_token_query(token: str = None, request: Request = None) -> str
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-# List available ROM files under backend/SNES (requires authentication)
-@app.get("/api/snes")
-def list_snes_roms(username: str = Depends(get_current_user)):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    rom_dir = os.path.join(base_dir, "SNES")
-    if not os.path.isdir(rom_dir):
-        return []
-    files = []
-    for name in os.listdir(rom_dir):
-        path = os.path.join(rom_dir, name)
-        if os.path.isfile(path) and name.lower().endswith(".nes"):
+# --- Resumable media uploads ---
+# create session -> PUT bytes at the current offset (repeat, resuming after failures)
+# -> complete. Chunks land in one staging file that is renamed into MEDIA_DIR.
+MAX_RESUMABLE_UPLOAD_BYTES = int(os.getenv("MAX_RESUMABLE_UPLOAD_BYTES", str(16 * 1024 * 1024 * 1024)))  # 16 GiB
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+# Per-user limits on open sessions and on their combined declared size
+UPLOAD_SESSIONS_PER_USER = int(os.getenv("UPLOAD_SESSIONS_PER_USER", "4"))
+UPLOAD_BYTES_PER_USER = int(os.getenv("UPLOAD_BYTES_PER_USER", str(32 * 1024 * 1024 * 1024)))  # 32 GiB
+UPLOAD_SESSIONS = UploadSessionStore(
+    STAGING_DIR,
+    ttl_sec=UPLOAD_SESSION_TTL,
+    max_sessions=UPLOAD_SESSIONS_PER_USER,
+    max_bytes=UPLOAD_BYTES_PER_USER,
+)
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+def _own_upload_session(sid: str, username: str):
+    s = UPLOAD_SESSIONS.get(sid)
+    if not s or s.owner != username:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return s
+
+def _claim_upload_session(s, busy_detail: str):
+    # Lock held until the returned file is closed; every caller closes it in a finally
+    try:
+        return UPLOAD_SESSIONS.claim(s)
+    except SessionBusy:
+        raise HTTPException(status_code=409, detail=busy_detail)
+    except SessionGone:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+def _upload_session_state(s) -> dict:
+    return {"id": s.id, "offset": s.offset(), "size": s.size, "chunk_size": UPLOAD_CHUNK_SIZE}
+
+@app.post("/api/upload/media/sessions")
+def create_upload_session(req: UploadSessionCreate, username: str = Depends(get_current_user)):
+    content_type = (req.content_type or "").lower()
+    if not (content_type.startswith("video/") or content_type.startswith("audio/")):
+        raise HTTPException(status_code=400, detail="Only video/audio uploads are allowed")
+    if req.size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+    if req.size > MAX_RESUMABLE_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File too large (max {MAX_RESUMABLE_UPLOAD_BYTES} bytes)")
+    try:
+        s = UPLOAD_SESSIONS.create(username, req.filename, content_type, req.size)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return _upload_session_state(s)
+
+@app.get("/api/upload/media/sessions/{sid}")
+def get_upload_session(sid: str, username: str = Depends(get_current_user)):
+    # Clients call this after a failure to learn where to resume
+    return _upload_session_state(_own_upload_session(sid, username))
+
+@app.put("/api/upload/media/sessions/{sid}")
+async def put_upload_chunk(sid: str, offset: int, request: Request, username: str = Depends(get_current_user)):
+    s = _own_upload_session(sid, username)
+    try:
+        f = await asyncio.to_thread(UPLOAD_SESSIONS.open_at, s, offset)
+    except SessionBusy:
+        raise HTTPException(status_code=409, detail="Another chunk is being written to this session")
+    except SessionGone:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    except OffsetMismatch as e:
+        raise HTTPException(status_code=409, detail="Offset mismatch", headers={"Upload-Offset": str(e.expected)})
+    pos = offset
+    try:
+        buf = bytearray()
+        async for chunk in request.stream():
+            if pos + len(buf) + len(chunk) > s.size:
+                raise HTTPException(status_code=413, detail="Chunk runs past the declared size")
+            buf += chunk
+            if len(buf) >= UPLOAD_CHUNK_SIZE:
+                pos = await asyncio.to_thread(UPLOAD_SESSIONS.append, s, f, pos, bytes(buf))
+                buf.clear()
+        if buf:
+            pos = await asyncio.to_thread(UPLOAD_SESSIONS.append, s, f, pos, bytes(buf))
+    finally:
+        # Releases the session lock; whatever reached disk stays and the client
+        # resumes from the reported offset
+        await asyncio.to_thread(f.close)
+    return {"id": s.id, "offset": pos, "size": s.size}
+
+@app.post("/api/upload/media/sessions/{sid}/complete")
+def complete_upload_session(sid: str, sha256: Optional[str] = None, username: str = Depends(get_current_user)):
+    s = _own_upload_session(sid, username)
+    f = _claim_upload_session(s, "A chunk is still being written")
+    try:
+        offset = f.tell()
+        if offset != s.size:
+            raise HTTPException(status_code=409, detail="Upload incomplete", headers={"Upload-Offset": str(offset)})
+        digest = s.digest(UPLOAD_CHUNK_SIZE)
+        if sha256 and sha256.lower() != digest:
+            UPLOAD_SESSIONS.discard(s)
+            raise HTTPException(status_code=422, detail="Checksum mismatch; upload discarded")
+        safe_name, deduplicated = _store_media(s.part_path, digest, _media_ext(s.filename))
+        UPLOAD_SESSIONS.forget(s)
+    finally:
+        f.close()
+    return {
+        "url": f"/uploads/media/{safe_name}",
+        "filename": safe_name,
+        "content_type": s.content_type,
+        "size": s.size,
+        "sha256": digest,
+        "deduplicated": deduplicated,
+    }
+
+@app.delete("/api/upload/media/sessions/{sid}")
+def abort_upload_session(sid: str, username: str = Depends(get_current_user)):
+    s = _own_upload_session(sid, username)
+    f = _claim_upload_session(s, "A chunk is still being written")
+    try:
+        UPLOAD_SESSIONS.discard(s)
+    finally:
+        f.close()
+    return {"ok": True}
+
+async def _sweep_upload_sessions_forever(interval: float = 600.0):
+    while True:
+        try:
+            removed = await asyncio.to_thread(UPLOAD_SESSIONS.sweep)
+            if removed:
+                logging.info(f"Removed {removed} abandoned upload staging files")
+        except Exception as e:
+            logging.error(f"Upload session sweep failed: {e}")
+        await asyncio.sleep(interval)
+
+@app.on_event("startup")
+async def start_upload_session_sweeper():
+    app.state.upload_sweeper = asyncio.create_task(_sweep_upload_sessions_forever())
+
+# --- ROM file serving ---
+# Strong ETags come from the file's SHA-256, taken from the ROM indexer's scan cache
+# (so each size+mtime is hashed once, shared with identification) behind a small LRU,
+# so repeat launches revalidate to a 304. A URL carrying ?v=<hash prefix> names immutable content
+# and may be cached for a year. Pre-built .zst/.gz siblings are served when the client
+# accepts them and no Range is requested; Range requests are handled by FileResponse.
+ROM_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ROM_PRECOMPRESSED = (("zstd", ".zst"), ("gzip", ".gz"))
+ROM_DIGEST_CACHE_SIZE = int(os.getenv("ROM_DIGEST_CACHE_SIZE", "1024"))
+_FILE_DIGESTS: "OrderedDict[tuple, str]" = OrderedDict()  # (path, size, mtime_ns) -> sha256 hex
+_FILE_DIGEST_LOCK = Lock()
+
+def _file_digest(path: str, st: os.stat_result) -> str:
+    key = (path, st.st_size, st.st_mtime_ns)
+    with _FILE_DIGEST_LOCK:
+        known = _FILE_DIGESTS.get(key)
+        if known is not None:
+            _FILE_DIGESTS.move_to_end(key)
+            return known
+    known = ROM_INDEXER.file_digest(path, st) or _file_sha256(path)
+    with _FILE_DIGEST_LOCK:
+        _FILE_DIGESTS[key] = known
+        while len(_FILE_DIGESTS) > ROM_DIGEST_CACHE_SIZE:
+            _FILE_DIGESTS.popitem(last=False)
+    return known
+
+def _accepts_encoding(request: Request, coding: str) -> bool:
+    for part in (request.headers.get("accept-encoding") or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() != coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            k, _, val = param.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        return q > 0
+    return False
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    # If-None-Match takes precedence; If-Modified-Since is only used without it
+    if request.headers.get("if-none-match"):
+        return _etag_matches(request, etag)
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(mtime) <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _serve_rom(rom_dir: str, filename: str, request: Request):
+    name = os.path.basename(filename)
+    path = os.path.join(rom_dir, name)
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    if name != filename or name.startswith(".") or st is None or not stat.S_ISREG(st.st_mode):
+        return JSONResponse(status_code=404, content={"detail": "ROM not found"})
+    digest = _file_digest(path, st)
+    v = request.query_params.get("v") or ""
+    if len(v) >= 16 and digest.startswith(v.lower()):
+        cache_control = f"private, max-age={ROM_IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = "private, no-cache"
+    serve_path, serve_st, encoding = path, st, None
+    if "range" not in request.headers:
+        for coding, suffix in ROM_PRECOMPRESSED:
+            if not _accepts_encoding(request, coding):
+                continue
             try:
-                size = os.path.getsize(path)
+                cst = os.stat(path + suffix)
             except OSError:
-                size = None
-            files.append({"name": os.path.splitext(name)[0], "file": name, "size": size})
-    # sort by name for stable ordering
-    files.sort(key=lambda x: x["name"].lower())
-    return files
+                continue
+            # A sibling older than the ROM is stale and ignored
+            if cst.st_mtime >= st.st_mtime:
+                serve_path, serve_st, encoding = path + suffix, cst, coding
+                break
+    etag = f'"{digest[:32]}-{encoding}"' if encoding else f'"{digest[:32]}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(serve_path, media_type="application/octet-stream", filename=name, headers=headers, stat_result=serve_st)
+
+# --- ROM catalog ---
+# One cached listing per platform directory, rebuilt only when the directory changes.
+# Note: the "SNES" folder holds NES images, matching what the arcade frontend expects.
+ROM_CATALOG = RomCatalog({
+    "snes": (os.path.join(BASE_DIR, "SNES"), (".nes",)),
+    "gba": (os.path.join(BASE_DIR, "GBA"), (".gba",)),
+})
+_ROM_LISTING_BODIES = {}  # platform -> (catalog version, body, etag)
+
+# ROM identification: headers + checksums per file, matched against a compiled index
+# of the bundled bsnes game databases. Both run off the request path (see startup).
+ROM_DB_SOURCE_DIR = os.getenv(
+    "BSNES_DATABASE_DIR", os.path.join(BASE_DIR, "..", "bsnes", "bsnes-nightly", "Database")
+)
+ROM_INDEX_INTERVAL = float(os.getenv("ROM_INDEX_INTERVAL", "30"))
+ROM_DATABASE = RomDatabase(ROM_DB_SOURCE_DIR, os.path.join(DATA_DIR, "romdb.sqlite3"))
+ROM_INDEXER = RomIndexer(ROM_CATALOG, ROM_DATABASE, os.path.join(DATA_DIR, "rom_index.sqlite3"))
+
+async def _index_roms_forever():
+    try:
+        rebuilt = await asyncio.to_thread(ROM_DATABASE.ensure)
+        if rebuilt:
+            logging.info("Compiled bsnes game database index")
+    except Exception as e:
+        logging.error(f"Game database compile failed: {e}")
+    while True:
+        try:
+            await asyncio.to_thread(ROM_INDEXER.run_once)
+        except Exception as e:
+            logging.error(f"ROM indexing failed: {e}")
+        await asyncio.sleep(ROM_INDEX_INTERVAL)
+
+@app.on_event("startup")
+async def start_rom_indexer():
+    app.state.rom_indexer = asyncio.create_task(_index_roms_forever())
+
+def _is_sha256_hex(value: str) -> bool:
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+# Cheats for a loaded ROM, keyed by the headerless SHA-256 the catalog reports in info.sha256
+@app.get("/api/cheats/{sha256}")
+def get_cheats(sha256: str, request: Request, username: str = Depends(get_current_user)):
+    sha = sha256.strip().lower()
+    if not _is_sha256_hex(sha):
+        raise HTTPException(status_code=400, detail="Expected a SHA-256 hex digest")
+    body = ROM_DATABASE.cheats_body(sha)
+    if body is None:
+        raise HTTPException(status_code=404, detail="No cheats for this ROM")
+    return _conditional_json(request, body, _strong_etag(body), "private, max-age=86400")
+
+def _rom_listing_response(request: Request, platform: str) -> Response:
+    version, items = ROM_CATALOG.listing(platform)
+    cached = _ROM_LISTING_BODIES.get(platform)
+    if cached is None or cached[0] != version:
+        body = _json_bytes(items)
+        cached = (version, body, _strong_etag(body))
+        _ROM_LISTING_BODIES[platform] = cached
+    return _conditional_json(request, cached[1], cached[2], "private, no-cache")
+
+@app.get("/api/roms")
+def list_rom_platforms(username: str = Depends(get_current_user)):
+    return [{"platform": k, "count": len(ROM_CATALOG.listing(k)[1])} for k in ROM_CATALOG.platforms()]
+
+@app.get("/api/roms/{platform}")
+def list_roms(platform: str, offset: int = 0, limit: int = 100, username: str = Depends(get_current_user)):
+    if ROM_CATALOG.platform(platform) is None:
+        raise HTTPException(status_code=404, detail="Unknown platform")
+    limit = min(max(limit, 1), 1000)
+    total, items = ROM_CATALOG.page(platform, offset, limit)
+    return {"platform": platform, "total": total, "offset": max(0, offset), "limit": limit, "items": items}
+
+@app.api_route("/api/roms/{platform}/{filename}", methods=["GET", "HEAD"])
+def get_rom(platform: str, filename: str, request: Request, token: str = None):
+    try:
+        get_user_from_token_query(token=token, request=request)
+    except HTTPException as e:
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+    p = ROM_CATALOG.platform(platform)
+    if p is None or not filename.lower().endswith(p.extensions):
+        return JSONResponse(status_code=404, content={"detail": "ROM not found"})
+    return _serve_rom(p.directory, filename, request)
+
+# List available ROM files under backend/SNES (requires authentication)
+@app.get("/api/snes")
+def list_snes_roms(request: Request, username: str = Depends(get_current_user)):
+    return _rom_listing_response(request, "snes")
 
 # Serve SNES ROMs from backend/SNES/ (requires authentication via header or query param)
 # Supports both GET and HEAD methods for EmulatorJS compatibility
@@ -626,32 +1435,12 @@ def get_snes_rom(filename: str, request: Request, token: str = None):
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
     
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    rom_path = os.path.join(base_dir, "SNES", filename)
-    if not os.path.exists(rom_path):
-        return JSONResponse(status_code=404, content={"detail": "ROM not found"})
-    
-    return FileResponse(rom_path, media_type="application/octet-stream", filename=filename)
+    return _serve_rom(os.path.join(BASE_DIR, "SNES"), filename, request)
 
 # List available GBA ROM files (requires authentication)
 @app.get("/api/gba")
-def list_gba_roms(username: str = Depends(get_current_user)):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    rom_dir = os.path.join(base_dir, "GBA")
-    if not os.path.isdir(rom_dir):
-        return []
-    files = []
-    for name in os.listdir(rom_dir):
-        path = os.path.join(rom_dir, name)
-        if os.path.isfile(path) and name.lower().endswith(".gba"):
-            try:
-                size = os.path.getsize(path)
-            except OSError:
-                size = None
-            files.append({"name": os.path.splitext(name)[0], "file": name, "size": size})
-    # sort by name for stable ordering
-    files.sort(key=lambda x: x["name"].lower())
-    return files
+def list_gba_roms(request: Request, username: str = Depends(get_current_user)):
+    return _rom_listing_response(request, "gba")
 
 # Serve GBA ROMs (requires authentication via header or query param)
 # Supports both GET and HEAD methods for EmulatorJS compatibility
@@ -663,138 +1452,126 @@ def get_gba_rom(filename: str, request: Request, token: str = None):
     except HTTPException as e:
         return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
     
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    rom_path = os.path.join(base_dir, "GBA", filename)
-    if not os.path.exists(rom_path):
-        return JSONResponse(status_code=404, content={"detail": "ROM not found"})
-    
-    return FileResponse(rom_path, media_type="application/octet-stream", filename=filename)
+    return _serve_rom(os.path.join(BASE_DIR, "GBA"), filename, request)
+
+# System metrics and checks for sysadmin dashboard.
+# A background task samples at a fixed cadence; requests only read the latest sample.
+# System counters are cheap and always sampled (they feed ?since= history); the process
+# table is only walked while someone has asked for it within PROCESS_IDLE_AFTER seconds.
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "2"))
+METRICS_HISTORY = int(os.getenv("METRICS_HISTORY", "1800"))  # samples kept for ?since= (1h at 2s)
+METRICS_SAMPLER = MetricsSampler(capacity=METRICS_HISTORY)
+PROCESS_TRACKER = ProcessTracker(
+    top_k=int(os.getenv("PROCESS_TOP_K", "50")),
+    idle_after=float(os.getenv("PROCESS_IDLE_AFTER", "60")),
+)
 
-# System metrics and checks for sysadmin dashboard
-@app.get("/api/metrics/system")
+async def _sample_metrics_forever():
+    while True:
+        for sampler in (METRICS_SAMPLER, PROCESS_TRACKER):
+            if sampler is PROCESS_TRACKER and not PROCESS_TRACKER.wanted():
+                continue
+            try:
+                await asyncio.to_thread(sampler.sample)
+            except Exception as e:
+                logging.error(f"Metrics sampling failed ({type(sampler).__name__}): {e}")
+        await asyncio.sleep(METRICS_INTERVAL)
 
-def system_metrics():
+@app.on_event("startup")
+async def start_metrics_sampler():
+    app.state.metrics_sampler = asyncio.create_task(_sample_metrics_forever())
+
+# ?since=<unix time> adds the history after that instant (e.g. the previous response's ts);
+# a negative value is a window in seconds, e.g. ?since=-300 for the last five minutes.
+@app.get("/api/metrics/system")
+def system_metrics(since: Optional[float] = None):
     try:
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        vmem = psutil.virtual_memory()
-        disks = []
-        for part in psutil.disk_partitions(all=False):
-            try:
-                usage = psutil.disk_usage(part.mountpoint)
-                disks.append({
-                    "device": part.device,
-                    "mountpoint": part.mountpoint,
-                    "fstype": part.fstype,
-                    "total": usage.total,
-                    "used": usage.used,
-                    "free": usage.free,
-                    "percent": usage.percent,
-                })
-            except Exception:
-                continue
-        boot_time = psutil.boot_time()
-        load_avg = None
-        try:
-            load_avg = os.getloadavg()
-        except Exception:
-            pass
-        return {
-            "cpu_percent": cpu_percent,
-            "memory": {
-                "total": vmem.total,
-                "available": vmem.available,
-                "percent": vmem.percent,
-                "used": vmem.used,
-                "free": vmem.free,
-            },
-            "disks": disks,
-            "boot_time": boot_time,
-            "load_avg": load_avg,
-            "pid_count": len(psutil.pids()),
-        }
+        snapshot = METRICS_SAMPLER.latest() or METRICS_SAMPLER.sample()
+        if since is not None:
+            snapshot = dict(snapshot, history=METRICS_SAMPLER.history(since))
+        return snapshot
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/metrics/processes")
 
 def processes(limit: int = 15):
-    procs = []
-    for p in psutil.process_iter(attrs=["pid", "name", "username", "cpu_percent", "memory_percent"]):
-        info = p.info
-        procs.append(info)
-    procs.sort(key=lambda x: (x.get("cpu_percent") or 0), reverse=True)
-    return procs[: max(limit, 1)]
+    # Top rows by CPU from the background tracker (at most PROCESS_TOP_K)
+    return PROCESS_TRACKER.top(limit)
+
+# Port/HTTP checks share one prober: a global concurrency cap, a short result cache and
+# coalescing of identical in-flight probes, all still limited to ALLOWED_CHECK_HOSTS.
+CHECK_CONCURRENCY = int(os.getenv("CHECK_CONCURRENCY", "32"))
+CHECK_CACHE_TTL = float(os.getenv("CHECK_CACHE_TTL", "5"))
+CHECK_BATCH_MAX = int(os.getenv("CHECK_BATCH_MAX", "100"))
+HEALTH_PROBER = HealthProber(_http_client, ALLOWED_CHECK_HOSTS, max_concurrency=CHECK_CONCURRENCY, ttl=CHECK_CACHE_TTL)
 
 @app.get("/api/checks/port")
 
-def check_port(host: str = "127.0.0.1", port: int = 22, timeout: float = 0.5):
+async def check_port(host: str = "127.0.0.1", port: int = 22, timeout: float = 0.5):
     host_l = (host or "").strip().lower()
     if host_l not in ALLOWED_CHECK_HOSTS:
         raise HTTPException(status_code=400, detail="Host not allowed")
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.settimeout(timeout)
-        try:
-            s.connect((host, port))
-            return {"host": host, "port": port, "open": True}
-        except Exception:
-            return {"host": host, "port": port, "open": False}
+    if not 0 < port < 65536:
+        raise HTTPException(status_code=400, detail="Port must be between 1 and 65535")
+    return await HEALTH_PROBER.port(host_l, port, min(timeout, 10.0))
 
 @app.get("/api/checks/http")
 
 async def check_http(url: str, timeout: float = 2.5):
     try:
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        if parsed.scheme not in ("http", "https"):
-            return {"url": url, "ok": False, "error": "unsupported scheme"}
-        host_l = (parsed.hostname or "").strip().lower()
-        if host_l not in ALLOWED_CHECK_HOSTS:
-            return {"url": url, "ok": False, "error": "host not allowed"}
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-            r = await client.get(url)
-            return {"url": url, "status_code": r.status_code, "ok": r.is_success}
+        return await HEALTH_PROBER.http(url, min(timeout, 10.0))
     except Exception as e:
         return {"url": url, "ok": False, "error": str(e)}
 
-@app.get("/api/visitors/active")
-def get_active_visitors():
-    import time
-    now = time.time()
-    active = []
-    with VISITOR_LOCK:
-        for ip, data in VISITORS.items():
-            if now - data.get("last_seen", 0) < 300:  # 5 minutes
-                active.append({
-                    "ip": ip,
-                    "user_agent": data.get("user_agent", ""),
-                    "os": _os_letter(data.get("user_agent", "")),
-                    "last_seen": data.get("last_seen", 0),
-                    "connected_at": data.get("connected_at", 0)
-                })
-    return active
-
-# Simple mesh topology (admin-only) for Live Infra Map
-@app.get("/mesh/topology")
-def mesh_topology(_: str = Depends(admin_required)):
+class CheckBatchRequest(BaseModel):
+    targets: List[str]  # "host:port", "[::1]:22" or http(s) URLs
+    timeout: float = 2.0
+
+# All targets are probed at once, so a sweep takes about as long as its slowest probe
+@app.post("/api/checks/batch")
+async def check_batch(req: CheckBatchRequest):
+    if len(req.targets) > CHECK_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {CHECK_BATCH_MAX} targets per batch")
+    started = time.perf_counter()
+    results = await HEALTH_PROBER.batch(req.targets, min(max(req.timeout, 0.1), 10.0))
+    return {"results": results, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+# Mesh topology (admin-only) for Live Infra Map. Nodes come from MESH_NODES_FILE or
+# MESH_NODES (JSON, see mesh.py); a background task probes them all every
+# MESH_PROBE_INTERVAL seconds and requests get the last encoded graph.
+def _default_mesh_nodes():
     try:
-        node_name = None
-        try:
-            node_name = os.uname().nodename
-        except Exception:
-            node_name = "localhost"
-        nodes = [
-            {
-                "id": "self",
-                "name": node_name,
-                "host": "127.0.0.1",
-                "http_url": "http://192.168.0.90/health",
-                "ssh_port": 22,
-            }
-        ]
-        edges = []
-        return {"nodes": nodes, "edges": edges}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        node_name = os.uname().nodename
+    except Exception:
+        node_name = "localhost"
+    return [{
+        "id": "self",
+        "name": node_name,
+        "host": "127.0.0.1",
+        "http_url": os.getenv("MESH_SELF_HEALTH_URL", "http://192.168.0.90/health"),
+        "ssh_port": 22,
+    }]
+
+MESH = MeshTopology(
+    HealthProber(_http_client, (), max_concurrency=CHECK_CONCURRENCY, ttl=0),
+    inventory_file=os.getenv("MESH_NODES_FILE"),
+    inventory_json=os.getenv("MESH_NODES"),
+    default_nodes=_default_mesh_nodes(),
+    interval=float(os.getenv("MESH_PROBE_INTERVAL", "15")),
+    timeout=float(os.getenv("MESH_PROBE_TIMEOUT", "2")),
+)
+
+@app.on_event("startup")
+async def start_mesh_prober():
+    app.state.mesh_prober = asyncio.create_task(MESH.run())
+
+# The frontend requests /api/mesh/topology; /mesh/topology is kept for direct callers
+@app.get("/api/mesh/topology")
+@app.get("/mesh/topology")
+def mesh_topology(request: Request, _: str = Depends(admin_required)):
+    body, etag = MESH.graph()
+    return _conditional_json(request, body, etag, "private, no-cache")
 
 def _validate_username(u: str) -> str:
     u = (u or "").strip()
@@ -819,7 +1596,7 @@ def _validate_password(pw: str) -> None:
         raise HTTPException(status_code=400, detail="Password must include 3 of: lower, upper, digit, symbol")
 
 @app.post("/api/register")
-async def register(req: RegisterRequest, request: FastAPIRequest, db: Session = Depends(get_db)):
+async def register(req: RegisterRequest, request: FastAPIRequest, db: AsyncSession = Depends(get_async_db)):
     # Gate registration
     if not REGISTRATION_OPEN and (not REGISTRATION_CODE or req.code != REGISTRATION_CODE):
         raise HTTPException(status_code=403, detail="Registration disabled")
@@ -828,7 +1605,7 @@ async def register(req: RegisterRequest, request: FastAPIRequest, db: Session =
 
     # Rate limit by IP
     ip = _client_ip_simple(request)
-    ok, retry = _rate_check("register_ip", ip, limit=5, window_sec=900)  # 5 per 15 min
+    ok, retry = await _rate_check_async("register_ip", ip, limit=5, window_sec=900)  # 5 per 15 min
     if not ok:
         headers = {"Retry-After": str(retry)}
         raise HTTPException(status_code=429, detail="Too many registration attempts, please try later", headers=headers)
@@ -839,57 +1616,65 @@ async def register(req: RegisterRequest, request: FastAPIRequest, db: Session =
     if not await _verify_captcha(req.captcha, ip):
         raise HTTPException(status_code=400, detail="Captcha verification failed")
     # Case-insensitive uniqueness
-    exists = db.query(User).filter(func.lower(User.username) == uname).first()
+    exists = await _user_by_username_async(db, uname)
     if exists:
         raise HTTPException(status_code=400, detail="Username already registered")
-    exists_e = db.query(User).filter(func.lower(User.email) == req.email.lower()).first()
+    exists_e = await _user_by_email_async(db, req.email)
     if exists_e:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(req.password)
+    hashed_password = await get_password_hash(req.password)
     new_user = User(username=uname, hashed_password=hashed_password, email=req.email, is_verified=False)
     db.add(new_user)
-    db.commit()
+    await db.commit()
     # Send verification email
     token = uuid4().hex + uuid4().hex
     db.add(EmailToken(user_id=new_user.id, token=token, purpose="verify", expires_at=_epoch_now() + 60 * 60 * 24))
-    db.commit()
+    await db.commit()
     base = str(request.base_url).rstrip("/")
     verify_link = f"{base}/verify-email?token={token}"
     body = f"Welcome {uname}!\n\nPlease verify your email by visiting:\n{verify_link}\n\nThis link expires in 24 hours."
-    _send_email("Verify your email", body, req.email)
-    _audit(db, "register", uname, ip, extra="pending-verify")
+    await asyncio.to_thread(_send_email, "Verify your email", body, req.email)
+    _audit("register", uname, ip, extra="pending-verify")
     return {"msg": "User registered successfully. Check your email to verify."}
 
 # Admin endpoints
+@app.get("/api/admin/audit/stats")
+def audit_stats(_: str = Depends(admin_required)):
+    return AUDIT_LOG.stats()
+
+@app.get("/api/admin/translate/providers")
+def translate_provider_health(_: str = Depends(admin_required)):
+    return PROVIDER_HEALTH.snapshot()
+
 @app.get("/api/admin/users")
-def list_users(_: str = Depends(admin_required), db: Session = Depends(get_db)):
+def list_users(_: str = Depends(admin_required), db: Session = Depends(get_read_db)):
     users = db.query(User).all()
     return [{"username": u.username, "email": u.email, "is_verified": u.is_verified, "is_approved": u.is_approved, "role": u.role or "user"} for u in users]
 
 @app.post("/admin/users")
-def create_user(req: dict, _: str = Depends(admin_required), db: Session = Depends(get_db)):
+async def create_user(req: dict, _: str = Depends(admin_required), db: AsyncSession = Depends(get_async_db)):
     uname = req.get("username")
     password = req.get("password")
     email = req.get("email", "")
     if not uname or not password:
         raise HTTPException(status_code=400, detail="Username and password required")
-    if db.query(User).filter(User.username == uname).first():
+    if await _user_by_username_async(db, uname):
         raise HTTPException(status_code=400, detail="Username already exists")
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-    new_user = User(username=uname, hashed_password=hashed.decode(), email=email, is_verified=True, is_approved=True, role="user")
+    hashed = await get_password_hash(password)
+    new_user = User(username=uname, hashed_password=hashed, email=email, is_verified=True, is_approved=True, role="user")
     db.add(new_user)
-    db.commit()
+    await db.commit()
     return {"msg": "User created"}
 
 FAILED_LOGIN_WINDOW = 900  # 15 minutes
 FAILED_LOGIN_LIMIT_PER_IP = 20
 FAILED_LOGIN_LIMIT_PER_USER = 8
 
-@app.post("/api/token")
-def login(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def _authenticate(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm, db: AsyncSession) -> str:
+    """Checks the credentials and returns a new access token, shared by both login routes."""
     ip = _client_ip_simple(request)
     # Rate limits for login attempts
-    ok_ip, retry_ip = _rate_check("login_ip", ip, limit=FAILED_LOGIN_LIMIT_PER_IP, window_sec=FAILED_LOGIN_WINDOW)
+    ok_ip, retry_ip = await _rate_check_async("login_ip", ip, limit=FAILED_LOGIN_LIMIT_PER_IP, window_sec=FAILED_LOGIN_WINDOW)
     if not ok_ip:
         headers = {"Retry-After": str(retry_ip)}
         raise HTTPException(status_code=429, detail="Too many login attempts, slow down", headers=headers)
@@ -897,14 +1682,15 @@ def login(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm = Depend
     uname = (form_data.username or "").strip()
     uname_l = uname.lower()
     # Case-insensitive lookup
-    user = db.query(User).filter(func.lower(User.username) == uname_l).first()
+    user = await _user_by_username_async(db, uname_l)
     now = _epoch_now()
     if user and user.locked_until and now < int(user.locked_until or 0):
-        _audit(db, "login_locked", user.username, ip)
+        _audit("login_locked", user.username, ip)
         raise HTTPException(status_code=423, detail="Account locked. Try again later.")
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    ok, needs_rehash = await verify_password(form_data.password, user.hashed_password) if user else (False, False)
+    if not ok:
         # per-user throttle on failures
-        _rate_check("login_user", uname_l, limit=FAILED_LOGIN_LIMIT_PER_USER, window_sec=FAILED_LOGIN_WINDOW)
+        await _rate_check_async("login_user", uname_l, limit=FAILED_LOGIN_LIMIT_PER_USER, window_sec=FAILED_LOGIN_WINDOW)
         if user:
             try:
                 user.failed_count = int(user.failed_count or 0) + 1
@@ -912,37 +1698,41 @@ def login(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm = Depend
                 if user.failed_count >= 5:
                     user.locked_until = now + 10 * 60
                     user.failed_count = 0
-                db.commit()
+                await db.commit()
             except Exception:
-                db.rollback()
-        _audit(db, "login_fail", uname_l, ip)
+                await db.rollback()
+        _audit("login_fail", uname_l, ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
     # Success: clear user failure bucket
-    with RL_LOCK:
-        RATE_BUCKETS["login_user"].pop(uname_l, None)
+    await asyncio.to_thread(RATE_LIMITER.reset, f"login_user:{uname_l}")
+    if needs_rehash:
+        # Cost factor changed since this hash was made; skipped when the pool is full
+        try:
+            user.hashed_password = await PASSWORD_HASHER.hash(form_data.password)
+        except HasherBusy:
+            pass
     try:
         user.failed_count = 0
-        db.commit()
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
     if REQUIRE_EMAIL_VERIFIED_FOR_LOGIN and not bool(user.is_verified):
         raise HTTPException(status_code=403, detail="Email not verified")
     if REQUIRE_APPROVAL_FOR_LOGIN and not bool(user.is_approved):
         raise HTTPException(status_code=403, detail="Account not approved")
     access_token = create_access_token(data={"sub": user.username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    _audit(db, "login_success", user.username, ip)
+    _audit("login_success", user.username, ip)
+    return access_token
+
+@app.post("/api/token")
+async def login(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    access_token = await _authenticate(request, form_data, db)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/token-cookie")
-def login_cookie(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    # Reuse validation from login by calling it and capturing the username again
-    result = login(request, form_data, db)
-    uname_l = (form_data.username or "").strip().lower()
-    user = db.query(User).filter(func.lower(User.username) == uname_l).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    jwt_token = create_access_token(data={"sub": user.username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    resp = JSONResponse(content=result)
+async def login_cookie(request: FastAPIRequest, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    jwt_token = await _authenticate(request, form_data, db)
+    resp = JSONResponse(content={"access_token": jwt_token, "token_type": "bearer"})
     secure = os.getenv("COOKIE_SECURE", "1") == "1"
     same_site = os.getenv("COOKIE_SAMESITE", "Lax")
     resp.set_cookie(
@@ -978,39 +1768,42 @@ class ResetConfirm(BaseModel):
     new_password: str
 
 @app.post("/password/reset/request")
-async def reset_request(req: ResetRequest, request: FastAPIRequest, db: Session = Depends(get_db)):
+async def reset_request(req: ResetRequest, request: FastAPIRequest, db: AsyncSession = Depends(get_async_db)):
     ip = _client_ip_simple(request)
     if not await _verify_captcha(req.captcha, ip):
         raise HTTPException(status_code=400, detail="Captcha verification failed")
-    user = db.query(User).filter(func.lower(User.email) == req.email.lower()).first()
+    user = await _user_by_email_async(db, req.email)
     if not user:
         # don't reveal existence
         return {"ok": True}
     token = uuid4().hex + uuid4().hex
     db.add(PasswordResetToken(user_id=user.id, token=token, expires_at=_epoch_now() + 60 * 60))
-    db.commit()
+    await db.commit()
     body = f"Password reset requested for {user.username}.\nToken: {token}\n\nUse this token within 1 hour."
-    _send_email("Password reset", body, user.email)
-    _audit(db, "reset_request", user.username, ip)
+    await asyncio.to_thread(_send_email, "Password reset", body, user.email)
+    _audit("reset_request", user.username, ip)
     return {"ok": True}
 
 @app.post("/password/reset/confirm")
-def reset_confirm(req: ResetConfirm, db: Session = Depends(get_db)):
+async def reset_confirm(req: ResetConfirm, db: AsyncSession = Depends(get_async_db)):
     _validate_password(req.new_password)
-    t = db.query(PasswordResetToken).filter(PasswordResetToken.token == req.token, PasswordResetToken.used == False).first()
+    t = (await db.execute(
+        select(PasswordResetToken).where(PasswordResetToken.token == req.token, PasswordResetToken.used == False).limit(1)
+    )).scalars().first()
     if not t or (t.expires_at and _epoch_now() > int(t.expires_at)):
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = db.query(User).filter(User.id == t.user_id).first()
+    user = await db.get(User, t.user_id)
     if not user:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user.hashed_password = get_password_hash(req.new_password)
+    user.hashed_password = await get_password_hash(req.new_password)
     t.used = True
-    db.commit()
+    await db.commit()
+    await asyncio.to_thread(TOKEN_REVOCATIONS.revoke, user.username)
     return {"ok": True}
 
 @app.post("/api/admin/users/{username}/approve")
 def admin_approve_user(username: str, _: str = Depends(admin_required), db: Session = Depends(get_db)):
-    u = db.query(User).filter(func.lower(User.username) == username.lower()).first()
+    u = _user_by_username(db, username)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     u.is_approved = True
@@ -1019,7 +1812,7 @@ def admin_approve_user(username: str, _: str = Depends(admin_required), db: Sess
 
 @app.post("/api/admin/users/{username}/unlock")
 def admin_unlock_user(username: str, _: str = Depends(admin_required), db: Session = Depends(get_db)):
-    u = db.query(User).filter(func.lower(User.username) == username.lower()).first()
+    u = _user_by_username(db, username)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     u.failed_count = 0
@@ -1029,25 +1822,27 @@ def admin_unlock_user(username: str, _: str = Depends(admin_required), db: Sessi
 
 @app.post("/api/admin/users/{username}/ban")
 def admin_ban_user(username: str, _: str = Depends(admin_required), db: Session = Depends(get_db)):
-    u = db.query(User).filter(func.lower(User.username) == username.lower()).first()
+    u = _user_by_username(db, username)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     u.is_approved = False
     db.commit()
+    TOKEN_REVOCATIONS.revoke(u.username)
     return {"ok": True}
 
 @app.post("/api/admin/users/{username}/delete")
 def admin_delete_user(username: str, _: str = Depends(admin_required), db: Session = Depends(get_db)):
-    u = db.query(User).filter(func.lower(User.username) == username.lower()).first()
+    u = _user_by_username(db, username)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(u)
     db.commit()
+    TOKEN_REVOCATIONS.revoke(u.username)
     return {"ok": True}
 
 @app.post("/api/admin/users/{username}/verify")
 def admin_verify_user(username: str, _: str = Depends(admin_required), db: Session = Depends(get_db)):
-    u = db.query(User).filter(func.lower(User.username) == username.lower()).first()
+    u = _user_by_username(db, username)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     u.is_verified = True
@@ -1055,17 +1850,18 @@ def admin_verify_user(username: str, _: str = Depends(admin_required), db: Sessi
     return {"ok": True}
 
 @app.post("/api/admin/users/{username}/update")
-def admin_update_user(username: str, req: dict, _: str = Depends(admin_required), db: Session = Depends(get_db)):
-    u = db.query(User).filter(func.lower(User.username) == username.lower()).first()
+async def admin_update_user(username: str, req: dict, _: str = Depends(admin_required), db: AsyncSession = Depends(get_async_db)):
+    u = await _user_by_username_async(db, username)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
+    old_username = u.username
     
     # Update username if provided and different
     new_username = req.get("username", "").strip()
     if new_username and new_username != u.username:
         # Check if new username already exists
-        existing = db.query(User).filter(func.lower(User.username) == new_username.lower()).first()
-        if existing:
+        existing = await _user_by_username_async(db, new_username)
+        if existing and existing.id != u.id:
             raise HTTPException(status_code=400, detail="Username already exists")
         u.username = new_username
     
@@ -1074,7 +1870,7 @@ def admin_update_user(username: str, req: dict, _: str = Depends(admin_required)
     if new_email != u.email:
         # Check if new email already exists (if not empty)
         if new_email:
-            existing = db.query(User).filter(func.lower(User.email) == new_email.lower()).first()
+            existing = await _user_by_email_async(db, new_email)
             if existing and existing.id != u.id:
                 raise HTTPException(status_code=400, detail="Email already exists")
         u.email = new_email if new_email else None
@@ -1087,16 +1883,19 @@ def admin_update_user(username: str, req: dict, _: str = Depends(admin_required)
     # Update password if provided
     new_password = req.get("newPassword", "").strip()
     if new_password:
-        u.hashed_password = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode('utf-8')
+        u.hashed_password = await get_password_hash(new_password)
     
-    db.commit()
+    await db.commit()
+    # Tokens name the user, so a rename ends the old name's sessions as a password change does
+    if new_password or u.username != old_username:
+        await asyncio.to_thread(TOKEN_REVOCATIONS.revoke, old_username)
     return {"ok": True}
 
 @app.get("/me")
 
 def read_users_me(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = TOKEN_VERIFIER.verify(token)
         username = payload.get("sub")
         if not username:
             raise HTTPException(status_code=401, detail="Invalid token payload")
@@ -1130,6 +1929,7 @@ def seed_default_pages():
                 {"type": "text", "content": "<h2>Media</h2><p>Add your videos, music, and photos here. Use the Gallery block for multiple images.</p>"}
             ]
             db.add(Page(name="media", content=json.dumps(default_media)))
+            _bump_page_version(db)
             db.commit()
     finally:
         db.close()
@@ -1152,89 +1952,177 @@ def _mask_ip(ip: str) -> str:
 
 @app.post("/api/visitors/ping")
 async def visitors_ping(req: FastAPIRequest):
-    import time
     ip = _client_ip_simple(req)
     ua = req.headers.get("user-agent", "")
     now = time.time()
-    with VISITOR_LOCK:
-        v = VISITORS.get(ip)
-        if not v:
-            v = {
-                "ip": ip,
-                "first_seen": now,
-                "last_seen": now,
-                "ua": ua,
-                "os": _os_letter(ua),
-                "pings": 1,
-            }
-            VISITORS[ip] = v
-        else:
-            v["last_seen"] = now
-            v["ua"] = ua or v.get("ua")
-            v["os"] = _os_letter(ua or v.get("ua", ""))
-            v["pings"] = int(v.get("pings", 0)) + 1
-    dur = now - v["first_seen"]
-    return {"ok": True, "ip": ip, "os": v["os"], "dur_sec": int(dur)}
+    v = VISITORS.ping(ip, ua, _os_letter(ua), now)
+    VISITOR_HISTORY.record(ip, v.os, v.pings == 1, now)
+    dur = now - v.first_seen
+    # masked_ip + first_seen identify the caller's own entry in the live stream's visitor list
+    return {"ok": True, "ip": ip, "masked_ip": _mask_ip(ip), "first_seen": int(v.first_seen), "os": v.os, "dur_sec": int(dur)}
 
+# Both paths serve the same listing: masked IPs plus OS and visit-length aggregates
+@app.get("/api/visitors/active")
 @app.get("/visitors/active")
 async def visitors_active(req: FastAPIRequest):
     ip_self = _client_ip_simple(req)
-    now = datetime.utcnow()
-    results = []
-    with VISITOR_LOCK:
-        # Cleanup stale (no ping for 30s)
-        stale = []
-        for ip, v in VISITORS.items():
-            if (now - v.get("last_seen", now)).total_seconds() > 30:
-                stale.append(ip)
-        for ip in stale:
-            VISITORS.pop(ip, None)
-
-        for ip, v in VISITORS.items():
-            dur = (now - v.get("first_seen", now)).total_seconds()
-            if dur >= 10:  # only count real visitors >10s
-                results.append({
-                    "ip": _mask_ip(ip),
-                    "os": v.get("os") or _os_letter(v.get("ua", "")),
-                    "dur_sec": int(dur),
-                    "self": (ip == ip_self),
-                })
-    # Stable order (oldest first)
-    results.sort(key=lambda x: x["dur_sec"], reverse=False)
-    return {"count": len(results), "visitors": results}
+    now = time.time()
+    snap = VISITORS.snapshot(now)
+    results = [
+        {
+            "ip": _mask_ip(ip),
+            "os": os_letter,
+            "dur_sec": int(now - first_seen),
+            "self": (ip == ip_self),
+        }
+        for ip, os_letter, first_seen in snap["visitors"]  # shortest visit first
+    ]
+    return {
+        "count": snap["count"],
+        "visitors": results,
+        "os_counts": snap["os_counts"],
+        "duration_buckets": snap["duration_buckets"],
+    }
 
-print(f"Using DATABASE_URL: {DATABASE_URL}")
+async def _sweep_visitors_forever(interval: float = 2.0):
+    while True:
+        try:
+            VISITORS.sweep()
+        except Exception as e:
+            logging.error(f"Visitor sweep failed: {e}")
+        await asyncio.sleep(interval)
 
-@app.get("/pages/{page_key}")
-async def get_page(page_key: str, db: Session = Depends(get_db)):
-    page = db.query(Page).filter(Page.name == page_key).first()
-    if page:
-        return {"content": page.content}
-    default_pages = {
-        "home": [
-            {"type": "text", "content": "Welcome to itsusi.eu - Portfolio and Projects\n\nThis is a homepage system with backend, arcade, terminal, and more."},
-        ],
-        "prices": [
-            {"type": "text", "content": "Pricing Information\n\nContact for custom quotes."},
-        ],
-        "creations": [
-            {"type": "text", "content": "My Creations\n\nVarious projects and works."},
-        ],
-        "education": [
-            {"type": "text", "content": "Education\n\nBackground and qualifications."},
-        ],
-        "work": [
-            {"type": "text", "content": "Work History\n\nProfessional experience."},
-        ],
-        "gallery": [
-            {"type": "text", "content": "Gallery\n\nImages and media."},
-        ],
-        "contact": [
-            {"type": "text", "content": "Contact Information\n\nGet in touch."},
+@app.on_event("startup")
+async def start_visitor_sweeper():
+    app.state.visitor_sweeper = asyncio.create_task(_sweep_visitors_forever())
+
+async def _flush_visitor_history_forever():
+    while True:
+        await asyncio.sleep(VISITOR_HISTORY_FLUSH)
+        try:
+            await asyncio.to_thread(VISITOR_HISTORY.flush)
+        except Exception as e:
+            logging.error(f"Visitor history flush failed: {e}")
+
+@app.on_event("startup")
+async def start_visitor_history():
+    app.state.visitor_history = asyncio.create_task(_flush_visitor_history_forever())
+
+@app.on_event("shutdown")
+async def flush_visitor_history():
+    try:
+        await asyncio.to_thread(VISITOR_HISTORY.flush, True)
+    except Exception as e:
+        logging.error(f"Visitor history flush failed: {e}")
+
+# Visitor history (admin). since/until are unix times; a negative since is seconds ago
+# (default: the last 24h). The step grows to keep at most `points` points, and long
+# ranges are read from hourly or daily rollups. The current minute is not included yet.
+@app.get("/api/visitors/history")
+def visitors_history(
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    step: Optional[int] = None,
+    points: int = 240,
+    _: str = Depends(admin_required),
+):
+    now = int(time.time())
+    until = until or now
+    if since is None:
+        since = until - 86400
+    elif since < 0:
+        since = now + since
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    result = VISITOR_HISTORY.query(since, until, step, max(1, min(points, 2000)))
+    result["dropped"] = VISITOR_HISTORY.dropped
+    return result
+
+# -------------------- Live dashboard stream (admin) --------------------
+# One shared producer feeds every open dashboard over server-sent events: a full
+# snapshot on connect, then merge patches of what changed (see live_stream).
+
+def _visitors_snapshot() -> dict:
+    # Stable fields only (first_seen rather than a duration), so the section changes only
+    # when visitors arrive or leave; clients derive durations themselves.
+    snap = VISITORS.snapshot()
+    return {
+        "count": snap["count"],
+        "os_counts": snap["os_counts"],
+        "duration_buckets": snap["duration_buckets"],
+        "visitors": [
+            {"ip": _mask_ip(ip), "os": os_letter, "first_seen": int(first_seen)}
+            for ip, os_letter, first_seen in reversed(snap["visitors"])
         ],
     }
-    content = default_pages.get(page_key, [])
-    return {"content": json.dumps(content)}
+
+LIVE_STREAM_INTERVAL = float(os.getenv("LIVE_STREAM_INTERVAL", "2"))
+LIVE_STREAM_PROCESSES = int(os.getenv("LIVE_STREAM_PROCESSES", "10"))
+LIVE_HUB = LiveHub(
+    {
+        "system": lambda: METRICS_SAMPLER.latest(),
+        "processes": lambda: processes(limit=LIVE_STREAM_PROCESSES),
+        "visitors": _visitors_snapshot,
+    },
+    interval=LIVE_STREAM_INTERVAL,
+    queue_size=int(os.getenv("LIVE_STREAM_QUEUE", "8")),
+)
+
+@app.on_event("startup")
+async def start_live_hub():
+    app.state.live_hub = asyncio.create_task(LIVE_HUB.run())
+
+# EventSource cannot set headers, so the token may also come from ?token=
+@app.get("/api/metrics/stream")
+async def metrics_stream(request: Request, token: str = None):
+    username = get_user_from_token_query(token=token, request=request)
+    if username != ADMIN_USER:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return StreamingResponse(
+        LIVE_HUB.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+print(f"Using DATABASE_URL: {DATABASE_URL}")
+
+DEFAULT_PAGES = {
+    "home": [
+        {"type": "text", "content": "Welcome to itsusi.eu - Portfolio and Projects\n\nThis is a homepage system with backend, arcade, terminal, and more."},
+    ],
+    "prices": [
+        {"type": "text", "content": "Pricing Information\n\nContact for custom quotes."},
+    ],
+    "creations": [
+        {"type": "text", "content": "My Creations\n\nVarious projects and works."},
+    ],
+    "education": [
+        {"type": "text", "content": "Education\n\nBackground and qualifications."},
+    ],
+    "work": [
+        {"type": "text", "content": "Work History\n\nProfessional experience."},
+    ],
+    "gallery": [
+        {"type": "text", "content": "Gallery\n\nImages and media."},
+    ],
+    "contact": [
+        {"type": "text", "content": "Contact Information\n\nGet in touch."},
+    ],
+}
+
+@app.get("/pages/{page_key}")
+async def get_page(page_key: str, request: Request):
+    def build(pages: dict):
+        if page_key in pages:
+            return {"content": pages[page_key]}
+        if page_key in DEFAULT_PAGES:
+            return {"content": json.dumps(DEFAULT_PAGES[page_key])}
+        return None
+    entry = await PAGE_CACHE.body_async(("pages", page_key), build)
+    if entry is None:
+        # Unknown keys are not cached so arbitrary paths cannot grow the cache
+        return {"content": json.dumps([])}
+    return _conditional_json(request, *entry)
 
 @app.get("/status")
 async def get_status():
@@ -0,0 +1,209 @@
+"""Mesh topology: node inventory, scheduled concurrent probing and a cached graph.
+
+The inventory is a JSON file ({"nodes": [...], "edges": [...]} or a bare node list)
+or the same JSON in an environment variable. Each node is
+{"id", "name", "host", "http_url", "ssh_port"}; http_url defaults to
+http://<host>/health and a null ssh_port skips the SSH probe. Without explicit edges,
+every node is linked to the first one (the node doing the probing).
+
+A background round probes every node's /health and SSH port at once, keeps per-node
+latency and an up/down history, and encodes the whole graph once. Requests are served
+that pre-encoded body, so their cost does not depend on the number of nodes. The file
+is re-read when its mtime changes; while it is missing or unreadable, the JSON from
+the environment (or the default nodes) is used instead.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from health_checks import HealthProber
+
+_NOT_LOADED = object()  # _file_mtime before the first load (None means the file is missing)
+
+
+def _url_host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _probe_view(result: Optional[dict]) -> Optional[dict]:
+    if result is None:
+        return None
+    return {k: v for k, v in result.items() if k not in ("cached", "url", "host", "port")}
+
+
+def _normalize(raw) -> Tuple[List[dict], List[dict]]:
+    if isinstance(raw, dict):
+        nodes, edges = raw.get("nodes") or [], raw.get("edges")
+    else:
+        nodes, edges = raw or [], None
+    out = []
+    for i, n in enumerate(nodes):
+        if not isinstance(n, dict) or not n.get("host"):
+            continue
+        host = str(n["host"]).strip()
+        out.append({
+            "id": str(n.get("id") or (f"node{i}" if i else "self")),
+            "name": n.get("name") or host,
+            "host": host,
+            "http_url": n.get("http_url", f"http://{host}/health"),
+            "ssh_port": n.get("ssh_port", 22),
+        })
+    if edges is None:
+        edges = [{"from": out[0]["id"], "to": n["id"]} for n in out[1:]]
+    ids = {n["id"] for n in out}
+    edges = [
+        {"from": str(e.get("from")), "to": str(e.get("to"))}
+        for e in edges
+        if isinstance(e, dict) and e.get("from") in ids and e.get("to") in ids
+    ]
+    return out, edges
+
+
+class _NodeState:
+    __slots__ = ("ssh", "http", "up", "checked_at", "changed_at", "history")
+
+    def __init__(self, history: int):
+        self.ssh: Optional[dict] = None
+        self.http: Optional[dict] = None
+        self.up: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self.changed_at: Optional[float] = None
+        self.history = deque(maxlen=history)  # 1 = up, 0 = down, oldest first
+
+
+class MeshTopology:
+    def __init__(
+        self,
+        prober: HealthProber,
+        inventory_file: Optional[str] = None,
+        inventory_json: Optional[str] = None,
+        default_nodes: Optional[List[dict]] = None,
+        interval: float = 15.0,
+        timeout: float = 2.0,
+        history: int = 120,
+    ):
+        self.prober = prober
+        self.inventory_file = inventory_file
+        self.inventory_json = inventory_json
+        self.default_nodes = default_nodes or []
+        self.interval = interval
+        self.timeout = timeout
+        self.history = history
+        self._file_mtime = _NOT_LOADED
+        self.nodes: List[dict] = []
+        self.edges: List[dict] = []
+        self._states: Dict[str, _NodeState] = {}
+        self._encoded: Tuple[bytes, str]
+        self._encode()
+        self.load_inventory()
+
+    def load_inventory(self) -> bool:
+        """(Re)load the inventory if it changed; returns True when it did."""
+        raw = None
+        if self.inventory_file:
+            try:
+                mtime = os.stat(self.inventory_file).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime == self._file_mtime:
+                return False
+            if mtime is None and self._file_mtime is not _NOT_LOADED:
+                logging.error(f"Mesh inventory {self.inventory_file} missing, using MESH_NODES or defaults")
+            self._file_mtime = mtime
+            if mtime is not None:
+                try:
+                    with open(self.inventory_file, encoding="utf-8") as f:
+                        raw = json.load(f)
+                except (OSError, ValueError) as e:
+                    logging.error(f"Mesh inventory {self.inventory_file} unreadable, using MESH_NODES or defaults: {e}")
+        elif self._file_mtime is not _NOT_LOADED:
+            return False
+        else:
+            self._file_mtime = None
+        if raw is None and self.inventory_json:
+            try:
+                raw = json.loads(self.inventory_json)
+            except ValueError as e:
+                logging.error(f"MESH_NODES is not valid JSON: {e}")
+        nodes, edges = _normalize(raw if raw is not None else self.default_nodes)
+        self.nodes, self.edges = nodes, edges
+        self._states = {n["id"]: self._states.get(n["id"]) or _NodeState(self.history) for n in nodes}
+        # The inventory itself is the allowlist for this prober
+        self.prober.allowed_hosts = {n["host"].lower() for n in nodes} | {
+            _url_host(n["http_url"]) for n in nodes if n.get("http_url")
+        }
+        self._encode()
+        return True
+
+    async def _probe_node(self, node: dict) -> None:
+        ssh = http = None
+        jobs = []
+        if node.get("ssh_port"):
+            jobs.append(self.prober.port(node["host"].lower(), int(node["ssh_port"]), self.timeout))
+        if node.get("http_url"):
+            jobs.append(self.prober.http(node["http_url"], self.timeout))
+        results = await asyncio.gather(*jobs)
+        if node.get("ssh_port"):
+            ssh = results.pop(0)
+        if node.get("http_url"):
+            http = results.pop(0)
+        st = self._states.get(node["id"])
+        if st is None:
+            return
+        up = bool(http["ok"]) if http is not None else bool(ssh and ssh.get("open"))
+        now = time.time()
+        if up != st.up:
+            st.changed_at = now
+        st.ssh, st.http, st.up, st.checked_at = ssh, http, up, now
+        st.history.append(1 if up else 0)
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self._probe_node(n) for n in self.nodes))
+        self._encode()
+
+    def _node_view(self, node: dict) -> dict:
+        st = self._states[node["id"]]
+        hist = st.history
+        return dict(
+            node,
+            status="unknown" if st.up is None else ("up" if st.up else "down"),
+            latency_ms=((st.http or {}).get("latency_ms") or (st.ssh or {}).get("latency_ms")),
+            ssh=_probe_view(st.ssh),
+            http=_probe_view(st.http),
+            checked_at=st.checked_at,
+            changed_at=st.changed_at,
+            uptime=round(sum(hist) / len(hist), 4) if hist else None,
+            history="".join("1" if h else "0" for h in hist),
+        )
+
+    def _encode(self) -> None:
+        views = {n["id"]: self._node_view(n) for n in self.nodes}
+        edges = [dict(e, latency_ms=views[e["to"]]["latency_ms"]) for e in self.edges]
+        graph = {
+            "nodes": list(views.values()),
+            "edges": edges,
+            "interval": self.interval,
+            "generated_at": time.time(),
+        }
+        body = json.dumps(graph, separators=(",", ":")).encode("utf-8")
+        self._encoded = (body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+    def graph(self) -> Tuple[bytes, str]:
+        """Pre-encoded graph body and its strong ETag."""
+        return self._encoded
+
+    async def run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await asyncio.to_thread(self.load_inventory)
+                await self.probe_all()
+            except Exception as e:
+                logging.error(f"Mesh probe round failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
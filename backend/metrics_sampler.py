@@ -0,0 +1,157 @@
+"""Background system metrics sampler with a fixed-size history.
+
+One sampler collects CPU, memory, disk, load and network counters at a fixed cadence,
+so dashboard requests only read the latest sample instead of calling psutil. Scalar
+series are kept in a ring buffer of array('d') columns (8 bytes per value, no
+per-sample dicts); the full latest sample is kept as the ready-made response.
+
+Disk partitions are re-listed every partitions_every seconds rather than per sample,
+and CPU usage comes from cpu_percent(interval=None), i.e. the time since the previous
+sample, so sampling never sleeps.
+"""
+import os
+import time
+from array import array
+from threading import Lock
+from typing import Dict, List, Optional
+
+import psutil
+
+# Columns of the history ring buffer. Rates are bytes per second since the previous sample.
+SERIES = ("ts", "cpu", "mem", "load1", "net_tx", "net_rx", "disk_read", "disk_write", "pids")
+
+
+class MetricsRing:
+    """Fixed-capacity ring buffer of float columns."""
+
+    def __init__(self, capacity: int, columns=SERIES):
+        self.capacity = max(1, capacity)
+        self.columns = tuple(columns)
+        self._data = {c: array("d", bytes(8 * self.capacity)) for c in self.columns}
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, values: Dict[str, float]) -> None:
+        i = self._next
+        for c in self.columns:
+            self._data[c][i] = values.get(c) or 0.0
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def since(self, ts: float) -> Dict[str, List[float]]:
+        """Samples newer than ts, oldest first, as one list per column."""
+        start = (self._next - self._count) % self.capacity
+        order = [(start + k) % self.capacity for k in range(self._count)]
+        times = self._data["ts"]
+        # Timestamps are increasing, so skip the older prefix
+        lo = 0
+        while lo < len(order) and times[order[lo]] <= ts:
+            lo += 1
+        order = order[lo:]
+        return {c: [self._data[c][i] for i in order] for c in self.columns}
+
+
+class MetricsSampler:
+    def __init__(self, capacity: int = 1800, partitions_every: float = 60.0):
+        self.partitions_every = partitions_every
+        self._ring = MetricsRing(capacity)
+        self._lock = Lock()  # guards the ring and latest
+        self._sample_lock = Lock()  # one sample at a time, so counter deltas stay consistent
+        self._latest: Optional[dict] = None
+        self._partitions: List = []
+        self._partitions_at = 0.0
+        self._prev_counters = None  # (monotonic, net, disk_io)
+        self._boot_time = psutil.boot_time()
+        psutil.cpu_percent(interval=None)  # prime: the first non-blocking call always returns 0.0
+
+    def _disks(self, now: float) -> List[dict]:
+        if not self._partitions or now - self._partitions_at >= self.partitions_every:
+            self._partitions = psutil.disk_partitions(all=False)
+            self._partitions_at = now
+        disks = []
+        for part in self._partitions:
+            try:
+                usage = psutil.disk_usage(part.mountpoint)
+            except Exception:
+                continue
+            disks.append({
+                "device": part.device,
+                "mountpoint": part.mountpoint,
+                "fstype": part.fstype,
+                "total": usage.total,
+                "used": usage.used,
+                "free": usage.free,
+                "percent": usage.percent,
+            })
+        return disks
+
+    def sample(self) -> dict:
+        """Collect one sample, record it in the history and return it."""
+        with self._sample_lock:
+            now = time.monotonic()
+            ts = time.time()
+            cpu_percent = psutil.cpu_percent(interval=None)
+            vmem = psutil.virtual_memory()
+            try:
+                load_avg = os.getloadavg()
+            except Exception:
+                load_avg = None
+            net = psutil.net_io_counters()
+            try:
+                disk_io = psutil.disk_io_counters()
+            except Exception:
+                disk_io = None
+            rates = {"net_tx": 0.0, "net_rx": 0.0, "disk_read": 0.0, "disk_write": 0.0}
+            prev = self._prev_counters
+            if prev is not None and now > prev[0]:
+                dt = now - prev[0]
+                if net and prev[1]:
+                    rates["net_tx"] = max(0, net.bytes_sent - prev[1].bytes_sent) / dt
+                    rates["net_rx"] = max(0, net.bytes_recv - prev[1].bytes_recv) / dt
+                if disk_io and prev[2]:
+                    rates["disk_read"] = max(0, disk_io.read_bytes - prev[2].read_bytes) / dt
+                    rates["disk_write"] = max(0, disk_io.write_bytes - prev[2].write_bytes) / dt
+            self._prev_counters = (now, net, disk_io)
+            pid_count = len(psutil.pids())
+            snapshot = {
+                "ts": ts,
+                "cpu_percent": cpu_percent,
+                "memory": {
+                    "total": vmem.total,
+                    "available": vmem.available,
+                    "percent": vmem.percent,
+                    "used": vmem.used,
+                    "free": vmem.free,
+                },
+                "disks": self._disks(now),
+                "boot_time": self._boot_time,
+                "load_avg": load_avg,
+                "pid_count": pid_count,
+                "net": {
+                    "bytes_sent": net.bytes_sent if net else None,
+                    "bytes_recv": net.bytes_recv if net else None,
+                    "tx_rate": rates["net_tx"],
+                    "rx_rate": rates["net_rx"],
+                },
+                "disk_io": {"read_rate": rates["disk_read"], "write_rate": rates["disk_write"]},
+            }
+            row = dict(rates, ts=ts, cpu=cpu_percent, mem=vmem.percent,
+                       load1=load_avg[0] if load_avg else 0.0, pids=pid_count)
+            with self._lock:
+                self._ring.append(row)
+                self._latest = snapshot
+            return snapshot
+
+    def latest(self) -> Optional[dict]:
+        with self._lock:
+            return self._latest
+
+    def history(self, since: float) -> Dict[str, List[float]]:
+        """Columns for samples newer than since (a unix time; negative means seconds ago)."""
+        if since < 0:
+            since = time.time() + since
+        with self._lock:
+            return self._ring.since(since)
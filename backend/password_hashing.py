@@ -0,0 +1,90 @@
+"""bcrypt hashing off the request path, on a bounded pool of worker processes.
+
+A bcrypt check costs about a quarter of a second of CPU. Run in the request
+thread, a burst of logins fills the shared threadpool and stalls every other
+sync endpoint. PasswordHasher sends the work to its own process pool (sized to
+the cores, so logins scale with them) and callers await the result without
+holding a thread.
+
+The number of jobs queued or running is capped: past max_pending, hash() and
+verify() raise HasherBusy immediately so the endpoint can answer 503 instead
+of letting latency grow without bound. verify() also reports whether a stored
+hash uses a different cost factor than the configured one, so it can be
+rehashed on the next successful login.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Too many hashing jobs queued; retry later."""
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(password: str, hashed: str) -> bool:
+    # bcrypt directly rather than passlib, which mishandles passwords over 72 bytes
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Cost factor of a "$2b$12$..." hash, or None if it is not bcrypt."""
+    parts = (hashed or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = 0, max_pending: int = 0, rounds: int = 12):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 8
+        self.rounds = rounds
+        self.pending = 0
+        self.rejected = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the server process holds threads and open SQLite files
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherBusy()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> Tuple[bool, bool]:
+        """Returns (matches, needs_rehash)."""
+        if not hashed:
+            return False, False
+        ok = await self._run(_verify, password, hashed)
+        return ok, ok and hash_rounds(hashed) != self.rounds
+
+    def retry_after(self) -> int:
+        # Rough time to drain the queue at ~0.25 s per job per worker
+        return max(1, round(self.pending * 0.25 / self.workers))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
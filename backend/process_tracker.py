@@ -0,0 +1,120 @@
+"""Incremental process table for the sysadmin dashboard.
+
+psutil.Process handles are kept across samples, so each process is created (and its
+name and owner looked up) once, and CPU usage is the real delta of its CPU times
+between two samples rather than a first-call 0.0. Sampling runs in the background;
+only the top_k rows by CPU are kept ready, selected with a heap instead of sorting
+every process, so a request is a slice of a prepared list.
+
+Walking every process is the expensive part, so the background loop only samples
+while the rows are wanted(): someone (a dashboard poll or the live stream) asked
+within idle_after seconds. The first request after an idle spell samples inline,
+its CPU figures averaged over the idle time.
+"""
+import heapq
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+
+import psutil
+
+
+class _Tracked:
+    __slots__ = ("proc", "name", "username", "cpu_time", "at", "cpu_percent", "rss")
+
+    def __init__(self, proc: psutil.Process, name: Optional[str], username: Optional[str]):
+        self.proc = proc
+        self.name = name
+        self.username = username
+        self.cpu_time: Optional[float] = None
+        self.at = 0.0
+        self.cpu_percent = 0.0
+        self.rss = 0
+
+    def row(self, total_mem: int) -> dict:
+        return {
+            "pid": self.proc.pid,
+            "name": self.name,
+            "username": self.username,
+            "cpu_percent": round(self.cpu_percent, 1),
+            "memory_percent": round(self.rss * 100.0 / total_mem, 2) if total_mem else None,
+            "rss": self.rss,
+        }
+
+
+def _open(pid: int) -> Optional[_Tracked]:
+    try:
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            name = proc.name()
+            try:
+                username = proc.username()
+            except (psutil.AccessDenied, KeyError):
+                username = None
+    except psutil.Error:
+        return None
+    return _Tracked(proc, name, username)
+
+
+class ProcessTracker:
+    def __init__(self, top_k: int = 50, idle_after: float = 60.0):
+        self.top_k = max(1, top_k)
+        self.idle_after = idle_after
+        self._requested_at = float("-inf")  # monotonic time of the last top() call
+        self._lock = Lock()  # guards _top
+        self._sample_lock = Lock()
+        self._tracked: Dict[int, _Tracked] = {}
+        self._top: Optional[List[dict]] = None
+        self.process_count = 0
+
+    def sample(self) -> None:
+        """Refresh every process's CPU delta and memory, then rebuild the top-K rows."""
+        with self._sample_lock:
+            total_mem = psutil.virtual_memory().total
+            previous = self._tracked
+            tracked: Dict[int, _Tracked] = {}
+            for pid in psutil.pids():
+                t = previous.get(pid) or _open(pid)
+                if t is None:
+                    continue
+                try:
+                    with t.proc.oneshot():
+                        times = t.proc.cpu_times()
+                        rss = t.proc.memory_info().rss
+                except psutil.AccessDenied:
+                    tracked[pid] = t
+                    continue
+                except psutil.Error:
+                    continue  # exited
+                now = time.monotonic()
+                cpu_time = times.user + times.system
+                if t.cpu_time is not None and now > t.at and cpu_time >= t.cpu_time:
+                    t.cpu_percent = (cpu_time - t.cpu_time) / (now - t.at) * 100.0
+                else:
+                    # First sample, or the pid was reused by a new process
+                    t.cpu_percent = 0.0
+                t.cpu_time, t.at, t.rss = cpu_time, now, rss
+                tracked[pid] = t
+            self._tracked = tracked
+            top = heapq.nlargest(self.top_k, tracked.values(), key=lambda t: (t.cpu_percent, t.rss))
+            rows = [t.row(total_mem) for t in top]
+            with self._lock:
+                self._top = rows
+                self.process_count = len(tracked)
+
+    def wanted(self) -> bool:
+        """True while rows were requested within the last idle_after seconds."""
+        return time.monotonic() - self._requested_at < self.idle_after
+
+    def top(self, limit: int) -> List[dict]:
+        """Up to limit (at most top_k) processes by CPU, from the latest sample."""
+        was_idle = not self.wanted()
+        self._requested_at = time.monotonic()
+        with self._lock:
+            rows = self._top
+        if rows is None or was_idle:
+            # Nothing sampled since the last request went idle: these rows would be stale
+            self.sample()
+            with self._lock:
+                rows = self._top
+        return rows[:max(1, limit)]
@@ -0,0 +1,103 @@
+"""Health tracking for upstream translation providers.
+
+Each provider gets a latency EWMA and a small circuit breaker: after a run of
+consecutive failures it is skipped for a cooldown (doubling on repeated trips,
+capped), then a single trial request is let through to decide whether to close it.
+"""
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+
+class _State:
+    __slots__ = ("ewma", "failures", "open_until", "cooldown", "probing", "ok", "fail")
+
+    def __init__(self):
+        self.ewma: Optional[float] = None  # seconds
+        self.failures = 0  # consecutive
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.probing = 0.0  # deadline of the in-flight half-open trial, 0 if none
+        self.ok = 0
+        self.fail = 0
+
+
+class ProviderHealth:
+    def __init__(self, failure_threshold: int = 3, base_cooldown: float = 30.0,
+                 max_cooldown: float = 600.0, alpha: float = 0.3, probe_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.probe_timeout = probe_timeout
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self._lock = Lock()
+        self._states: Dict[str, _State] = {}
+
+    def _state(self, name: str) -> _State:
+        st = self._states.get(name)
+        if st is None:
+            st = self._states[name] = _State()
+        return st
+
+    def available(self, name: str) -> bool:
+        """True if a request may go to name now; claims the half-open trial slot if needed."""
+        now = time.monotonic()
+        with self._lock:
+            st = self._state(name)
+            if st.open_until == 0.0:
+                return True
+            if now < st.open_until or now < st.probing:
+                return False
+            # A trial that never reported back (e.g. cancelled) expires after probe_timeout
+            st.probing = now + self.probe_timeout
+            return True
+
+    def order(self, names: Iterable[str]) -> List[str]:
+        """Usable providers by latency EWMA; untried ones go first, in configured order."""
+        now = time.monotonic()
+        ranked = []
+        with self._lock:
+            for i, name in enumerate(names):
+                st = self._state(name)
+                if st.open_until and (now < st.open_until or now < st.probing):
+                    continue
+                ranked.append((st.ewma if st.ewma is not None else 0.0, i, name))
+        ranked.sort()
+        return [name for _, _, name in ranked]
+
+    def record_success(self, name: str, latency: float) -> None:
+        with self._lock:
+            st = self._state(name)
+            st.ewma = latency if st.ewma is None else (self.alpha * latency + (1 - self.alpha) * st.ewma)
+            st.failures = 0
+            st.open_until = 0.0
+            st.cooldown = 0.0
+            st.probing = 0.0
+            st.ok += 1
+
+    def record_failure(self, name: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            st = self._state(name)
+            if latency is not None:
+                st.ewma = latency if st.ewma is None else (self.alpha * latency + (1 - self.alpha) * st.ewma)
+            st.failures += 1
+            st.fail += 1
+            if st.probing or st.failures >= self.failure_threshold:
+                st.cooldown = min(self.max_cooldown, st.cooldown * 2 if st.cooldown else self.base_cooldown)
+                st.open_until = time.monotonic() + st.cooldown
+            st.probing = 0.0
+
+    def snapshot(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "ewma_ms": round(st.ewma * 1000, 1) if st.ewma is not None else None,
+                    "open": bool(st.open_until and now < st.open_until),
+                    "retry_in_sec": max(0, int(st.open_until - now)) if st.open_until else 0,
+                    "consecutive_failures": st.failures,
+                    "ok": st.ok,
+                    "fail": st.fail,
+                }
+                for name, st in self._states.items()
+            }
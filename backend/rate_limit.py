@@ -0,0 +1,112 @@
+"""Rate limiting with GCRA (generic cell rate algorithm).
+
+"limit requests per window" is enforced by keeping one number per key, the
+theoretical arrival time (TAT): each allowed request pushes it forward by
+window / limit, and a request is refused while it would move the TAT more than one
+window ahead of now. That admits a burst of `limit` and then one request per
+window / limit, with O(1) state per key. A key whose TAT is in the past behaves
+exactly like an unknown key, so idle keys can be deleted at any time.
+
+Two stores share that logic:
+- MemoryRateLimiter: a dict, for a single process.
+- SQLiteRateLimiter: one row per key in a WAL database; each check is a single
+  atomic UPSERT ... RETURNING statement, so any number of worker processes
+  pointed at the same file share the same limits.
+"""
+import math
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+
+def _gcra(tat: Optional[float], now: float, limit: int, window: float) -> Tuple[bool, float, float]:
+    """Returns (allowed, new_tat, retry_after_seconds)."""
+    interval = window / max(1, limit)
+    base = max(tat or 0.0, now)
+    new_tat = base + interval
+    allow_at = new_tat - window
+    if allow_at > now:
+        return False, tat, allow_at - now
+    return True, new_tat, 0.0
+
+
+def _retry_seconds(retry: float) -> int:
+    return max(1, math.ceil(retry))
+
+
+class MemoryRateLimiter:
+    def __init__(self):
+        self._lock = Lock()
+        self._tat: Dict[str, float] = {}
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, int]:
+        """Record one request for key; returns (allowed, retry_after_seconds)."""
+        now = time.time()
+        with self._lock:
+            ok, tat, retry = _gcra(self._tat.get(key), now, limit, window)
+            if ok:
+                self._tat[key] = tat
+        return (True, 0) if ok else (False, _retry_seconds(retry))
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._tat.pop(key, None)
+
+    def evict_idle(self) -> int:
+        now = time.time()
+        with self._lock:
+            idle = [k for k, tat in self._tat.items() if tat <= now]
+            for k in idle:
+                del self._tat[k]
+        return len(idle)
+
+
+class SQLiteRateLimiter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, int]:
+        """Record one request for key; returns (allowed, retry_after_seconds)."""
+        now = time.time()
+        interval = window / max(1, limit)
+        with self._lock:
+            # Insert or advance the TAT only if the request is allowed (see _gcra)
+            row = self._conn.execute(
+                "INSERT INTO rate_limits (key, tat) VALUES (?1, ?2 + ?3)"
+                " ON CONFLICT(key) DO UPDATE SET tat = max(tat, ?2) + ?3"
+                " WHERE max(tat, ?2) + ?3 - ?4 <= ?2"
+                " RETURNING tat",
+                (key, now, interval, float(window)),
+            ).fetchone()
+            if row is not None:
+                return True, 0
+            tat = self._conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        _, _, retry = _gcra(tat[0] if tat else None, now, limit, window)
+        return False, _retry_seconds(retry)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (time.time(),)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_limiter(backend: str, path: str):
+    """RATE_LIMIT_BACKEND: "sqlite" (shared across workers) or "memory"."""
+    if backend == "memory":
+        return MemoryRateLimiter()
+    return SQLiteRateLimiter(path)
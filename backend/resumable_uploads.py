@@ -0,0 +1,278 @@
+"""Resumable upload sessions for large media files.
+
+A session is a pair of files in the staging directory: <id>.json with the metadata
+and <id>.part with the bytes received so far. Chunks are appended strictly at the
+current end of the .part file (the client asks for the offset and resumes from there),
+so the finished file is assembled in place and only renamed on completion.
+
+The SHA-256 is updated as chunks arrive. If the process restarted mid-upload the
+in-memory hash state is gone, and the digest is computed from the .part file instead.
+
+The staging directory must not be publicly served. Each owner may hold at most
+max_sessions open sessions and max_bytes of declared upload size across them; a
+session's bytes can never exceed its declared size, so this also bounds what the
+owner can keep on disk.
+
+Sessions are shared between worker processes through these files, so a request
+that writes, completes or aborts a session first claims it with an exclusive,
+non-blocking flock on its .part file (POSIX only). The lock covers other threads
+and other workers alike and is released when the claimed file is closed; the
+offset is read from that locked descriptor, so two writers can never both append.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import time
+from threading import Lock
+from typing import Dict, Optional
+from uuid import uuid4
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, expected: int):
+        super().__init__(f"expected offset {expected}")
+        self.expected = expected
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class SessionBusy(Exception):
+    """Another request (in any worker) holds the session."""
+
+
+class SessionGone(Exception):
+    """The session was completed or discarded meanwhile."""
+
+
+def _try_lock(path: str, mode: str = "r+b"):
+    """Open path and take an exclusive flock on it; None if someone else holds it."""
+    f = open(path, mode)
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+class UploadSession:
+    __slots__ = ("id", "owner", "filename", "content_type", "size", "created_at",
+                 "part_path", "meta_path", "_hasher", "_hashed")
+
+    def __init__(self, root: str, id: str, owner: str, filename: str, content_type: str,
+                 size: int, created_at: int):
+        self.id = id
+        self.owner = owner
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.created_at = created_at
+        self.part_path = os.path.join(root, f"{id}.part")
+        self.meta_path = os.path.join(root, f"{id}.json")
+        self._hasher = hashlib.sha256()
+        self._hashed = 0  # bytes fed to _hasher; only meaningful while it tracks the file end
+
+    def to_meta(self) -> dict:
+        return {
+            "id": self.id,
+            "owner": self.owner,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+            "created_at": self.created_at,
+        }
+
+    def offset(self) -> int:
+        try:
+            return os.path.getsize(self.part_path)
+        except OSError:
+            return 0
+
+    def write(self, f, offset: int, data: bytes) -> None:
+        f.write(data)
+        f.flush()
+        if self._hasher is not None and self._hashed == offset:
+            self._hasher.update(data)
+            self._hashed += len(data)
+        else:
+            self._hasher = None
+
+    def digest(self, chunk_size: int = 1024 * 1024) -> str:
+        if self._hasher is not None and self._hashed == self.offset():
+            return self._hasher.hexdigest()
+        h = hashlib.sha256()
+        with open(self.part_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+
+class UploadSessionStore:
+    def __init__(self, root: str, ttl_sec: int = 24 * 3600, max_sessions: int = 4,
+                 max_bytes: int = 32 * 1024 * 1024 * 1024):
+        self.root = root
+        self.ttl_sec = ttl_sec
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._sessions: Dict[str, UploadSession] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _refresh_locked(self) -> None:
+        # Sessions survive restarts (and are shared between workers) through their
+        # metadata files; sync the in-memory map with them so quotas count every session
+        try:
+            stems = {n[:-5] for n in os.listdir(self.root) if n.endswith(".json")}
+        except OSError:
+            return
+        for sid in stems - self._sessions.keys():
+            s = self._load(sid)
+            if s is not None:
+                self._sessions[sid] = s
+        for sid in [sid for sid in self._sessions if sid not in stems]:
+            del self._sessions[sid]
+
+    def _load(self, sid: str) -> Optional[UploadSession]:
+        try:
+            with open(os.path.join(self.root, f"{sid}.json")) as f:
+                m = json.load(f)
+        except (OSError, ValueError):
+            return None
+        s = UploadSession(self.root, sid, m["owner"], m["filename"], m["content_type"], int(m["size"]), int(m["created_at"]))
+        s._hasher = None
+        if not os.path.exists(s.part_path):
+            return None
+        return s
+
+    def create(self, owner: str, filename: str, content_type: str, size: int) -> UploadSession:
+        s = UploadSession(self.root, uuid4().hex, owner, filename, content_type, size, int(time.time()))
+        with self._lock:
+            self._refresh_locked()
+            mine = [o for o in self._sessions.values() if o.owner == owner]
+            if len(mine) >= self.max_sessions:
+                raise QuotaExceeded(f"Too many open upload sessions (max {self.max_sessions})")
+            if sum(o.size for o in mine) + size > self.max_bytes:
+                raise QuotaExceeded(f"Open upload sessions would exceed {self.max_bytes} bytes")
+            # Files are written under the lock so a concurrent refresh never sees the
+            # session in memory without its metadata file
+            open(s.part_path, "wb").close()
+            with open(s.meta_path, "w") as f:
+                json.dump(s.to_meta(), f)
+            self._sessions[s.id] = s
+        return s
+
+    def get(self, sid: str) -> Optional[UploadSession]:
+        if not sid.isalnum():
+            return None
+        with self._lock:
+            s = self._sessions.get(sid)
+        if s is not None:
+            return s
+        s = self._load(sid)
+        if s is None:
+            return None
+        with self._lock:
+            return self._sessions.setdefault(sid, s)
+
+    def claim(self, s: UploadSession):
+        """Lock the session's .part file for this request; close the returned file to release.
+
+        Raises SessionBusy if another request holds it, SessionGone if it no longer exists.
+        The returned file is positioned at the end, ready for appending.
+        """
+        try:
+            f = _try_lock(s.part_path)
+        except FileNotFoundError:
+            raise SessionGone(s.id)
+        if f is None:
+            raise SessionBusy(s.id)
+        try:
+            # The holder we waited out may have completed (renamed) or discarded the session
+            if not os.path.exists(s.meta_path) or os.stat(s.part_path).st_ino != os.fstat(f.fileno()).st_ino:
+                raise SessionGone(s.id)
+        except (OSError, SessionGone):
+            f.close()
+            with self._lock:
+                self._sessions.pop(s.id, None)
+            raise SessionGone(s.id)
+        f.seek(0, os.SEEK_END)
+        return f
+
+    def append(self, s: UploadSession, f, offset: int, data: bytes) -> int:
+        s.write(f, offset, data)
+        os.utime(s.meta_path)  # last activity, used by sweep()
+        return offset + len(data)
+
+    def open_at(self, s: UploadSession, offset: int):
+        """Claim the session for appending at offset, which must be its current size."""
+        f = self.claim(s)
+        current = f.tell()
+        if offset != current:
+            f.close()
+            raise OffsetMismatch(current)
+        return f
+
+    def forget(self, s: UploadSession) -> None:
+        # Drop the session but leave the .part file (it has been moved or deleted by the caller)
+        with self._lock:
+            self._sessions.pop(s.id, None)
+        try:
+            os.unlink(s.meta_path)
+        except OSError:
+            pass
+
+    def discard(self, s: UploadSession) -> None:
+        self.forget(s)
+        try:
+            os.unlink(s.part_path)
+        except OSError:
+            pass
+
+    def sweep(self) -> int:
+        """Delete session and orphaned staging files idle for ttl_sec; returns the file count."""
+        cutoff = time.time() - self.ttl_sec
+        removed = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext not in (".json", ".part"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if mtime >= cutoff:
+                continue
+            # A .part is only stale if its session metadata is stale (or missing) too
+            if ext == ".part":
+                meta = os.path.join(self.root, f"{stem}.json")
+                try:
+                    if os.path.getmtime(meta) >= cutoff:
+                        continue
+                except OSError:
+                    pass
+            # Skip sessions a request (in any worker) is working on right now
+            try:
+                held = _try_lock(os.path.join(self.root, f"{stem}.part"))
+            except OSError:
+                held = False  # no .part file, nothing to lock
+            if held is None:
+                continue
+            try:
+                with self._lock:
+                    self._sessions.pop(stem, None)
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+            finally:
+                if held:
+                    held.close()
+        return removed
@@ -0,0 +1,112 @@
+"""In-memory ROM catalog, one listing per platform directory.
+
+Each directory is scanned once and the sorted listing is kept in memory. A listing is
+rebuilt only when the directory's mtime changes (files added, removed or renamed),
+and the mtime itself is checked at most once per check_interval seconds.
+
+Per-file metadata from the background indexer (see rom_identify) is merged into the
+listing as an "info" object plus a "v" content-hash prefix for immutable ROM URLs.
+"""
+import os
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class Platform:
+    __slots__ = ("key", "directory", "extensions", "lock", "dir_mtime", "checked_at", "base", "details",
+                 "items", "version")
+
+    def __init__(self, key: str, directory: str, extensions: Sequence[str]):
+        self.key = key
+        self.directory = directory
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.lock = Lock()
+        self.dir_mtime: Optional[int] = None
+        self.checked_at = 0.0
+        self.base: List[dict] = []  # scanned entries
+        self.details: Dict[str, dict] = {}  # file -> indexer metadata
+        self.items: List[dict] = []  # base merged with details
+        self.version = 0  # bumped whenever items change
+
+
+class RomCatalog:
+    def __init__(self, platforms: Dict[str, Tuple[str, Sequence[str]]], check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._platforms = {k: Platform(k, d, exts) for k, (d, exts) in platforms.items()}
+
+    def platforms(self) -> List[str]:
+        return list(self._platforms)
+
+    def platform(self, key: str) -> Optional[Platform]:
+        return self._platforms.get(key)
+
+    def _scan(self, p: Platform) -> List[dict]:
+        items = []
+        try:
+            entries = list(os.scandir(p.directory))
+        except OSError:
+            return items
+        for e in entries:
+            if not e.name.lower().endswith(p.extensions):
+                continue
+            try:
+                if not e.is_file():
+                    continue
+                size = e.stat().st_size
+            except OSError:
+                size = None
+            items.append({"name": os.path.splitext(e.name)[0], "file": e.name, "size": size})
+        # sort by name for stable ordering
+        items.sort(key=lambda x: x["name"].lower())
+        return items
+
+    def _merge(self, p: Platform) -> None:
+        items = []
+        for base in p.base:
+            d = p.details.get(base["file"])
+            items.append(dict(base, v=(d.get("file_sha256") or "")[:16], info=d) if d else base)
+        p.items = items
+        p.version += 1
+
+    def set_details(self, key: str, details: Dict[str, dict], based_on: int) -> Optional[int]:
+        """Attach indexer metadata computed from listing version based_on.
+
+        Returns the new version, or None if the listing changed in the meantime
+        (the details are still applied, but the caller should index again).
+        """
+        p = self._platforms[key]
+        with p.lock:
+            current = p.version == based_on
+            p.details = details
+            self._merge(p)
+            return p.version if current else None
+
+    def refresh(self, p: Platform, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - p.checked_at < self.check_interval:
+            return
+        with p.lock:
+            if not force and now - p.checked_at < self.check_interval:
+                return
+            try:
+                mtime = os.stat(p.directory).st_mtime_ns
+            except OSError:
+                mtime = -1
+            if force or mtime != p.dir_mtime:
+                # Read the mtime before scanning so a change during the scan triggers another one
+                p.base = self._scan(p) if mtime != -1 else []
+                p.dir_mtime = mtime
+                self._merge(p)
+            p.checked_at = time.monotonic()
+
+    def listing(self, key: str) -> Tuple[int, List[dict]]:
+        """Return (version, items) for a platform; items must not be mutated."""
+        p = self._platforms[key]
+        self.refresh(p)
+        return p.version, p.items
+
+    def page(self, key: str, offset: int = 0, limit: int = 100) -> Tuple[int, List[dict]]:
+        _, items = self.listing(key)
+        offset = max(0, offset)
+        return len(items), items[offset:offset + max(0, limit)]
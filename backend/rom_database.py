@@ -0,0 +1,201 @@
+"""Compiled, indexed form of the bundled bsnes game and cheat databases.
+
+The BML sources are parsed once into a small SQLite file keyed by SHA-256. The file
+records the size and mtime of every source it was built from, so it is only rebuilt
+when a source changes; otherwise startup just opens it.
+
+Cheats are stored per cartridge as a ready-to-send JSON body, so a lookup is one
+primary-key read with no parsing or encoding.
+"""
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+import bml
+
+SCHEMA_VERSION = 2
+
+# Source file -> system tag stored with each game
+GAME_SOURCES = {
+    "Super Famicom.bml": "sfc",
+    "BS Memory.bml": "bs",
+    "Sufami Turbo.bml": "st",
+}
+CHEAT_SOURCE = "Cheat Codes.bml"
+
+
+def _json_bytes(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _rom_size(game: bml.Node) -> Optional[int]:
+    for board in game.find("board"):
+        for mem in board.find("memory"):
+            if mem.get("type") == "ROM" and mem.get("content") in (None, "Program"):
+                try:
+                    return int(mem.get("size") or "", 16)
+                except ValueError:
+                    return None
+    return None
+
+
+class RomDatabase:
+    def __init__(self, source_dir: str, index_path: str):
+        self.source_dir = source_dir
+        self.index_path = index_path
+        self._lock = Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _signature(self) -> str:
+        files = {}
+        for name in sorted([*GAME_SOURCES, CHEAT_SOURCE]):
+            try:
+                st = os.stat(os.path.join(self.source_dir, name))
+                files[name] = [st.st_size, st.st_mtime_ns]
+            except OSError:
+                files[name] = None
+        return json.dumps({"schema": SCHEMA_VERSION, "files": files}, sort_keys=True)
+
+    def _stored_signature(self) -> Optional[str]:
+        try:
+            conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return None
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+
+    def compile(self, signature: Optional[str] = None) -> dict:
+        """Parse the BML sources into a fresh index file; returns build stats."""
+        started = time.perf_counter()
+        signature = signature or self._signature()
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        conn = sqlite3.connect(tmp)
+        count = 0
+        try:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE games (sha256 BLOB PRIMARY KEY, system TEXT, name TEXT, label TEXT,"
+                " region TEXT, revision TEXT, board TEXT, rom_size INTEGER) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE cheats (sha256 BLOB PRIMARY KEY, name TEXT, count INTEGER, body BLOB)")
+            rows = []
+            for fname, system in GAME_SOURCES.items():
+                path = os.path.join(self.source_dir, fname)
+                if not os.path.exists(path):
+                    continue
+                for node in bml.parse_file(path):
+                    if node.name != "game":
+                        continue
+                    try:
+                        digest = bytes.fromhex(node.get("sha256") or "")
+                    except ValueError:
+                        continue
+                    if len(digest) != 32:
+                        continue
+                    rows.append((
+                        digest, system, node.get("name"), node.get("label"), node.get("region"),
+                        node.get("revision"), node.get("board"), _rom_size(node),
+                    ))
+            conn.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            count = len(rows)
+            cheat_rows = list(self._cheat_rows())
+            conn.executemany("INSERT OR REPLACE INTO cheats VALUES (?, ?, ?, ?)", cheat_rows)
+            conn.execute("INSERT INTO meta VALUES ('signature', ?)", (signature,))
+            conn.commit()
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        os.replace(tmp, self.index_path)
+        return {
+            "games": count,
+            "cartridges": len(cheat_rows),
+            "seconds": time.perf_counter() - started,
+            "bytes": os.path.getsize(self.index_path),
+        }
+
+    def _cheat_rows(self):
+        path = os.path.join(self.source_dir, CHEAT_SOURCE)
+        if not os.path.exists(path):
+            return
+        for node in bml.parse_file(path):
+            if node.name != "cartridge":
+                continue
+            sha = (node.get("sha256") or "").lower()
+            try:
+                digest = bytes.fromhex(sha)
+            except ValueError:
+                continue
+            if len(digest) != 32:
+                continue
+            cheats = [
+                {"description": c.get("description") or "", "code": c.get("code") or ""}
+                for c in node.find("cheat")
+            ]
+            body = _json_bytes({"sha256": sha, "name": node.get("name"), "cheats": cheats})
+            yield digest, node.get("name"), len(cheats), body
+
+    def ensure(self) -> bool:
+        """Open the index, compiling it first if it is missing or stale. Returns True if rebuilt."""
+        signature = self._signature()
+        rebuilt = False
+        if self._stored_signature() != signature:
+            self.compile(signature)
+            rebuilt = True
+        conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+        with self._lock:
+            old, self._conn = self._conn, conn
+        if old is not None:
+            old.close()
+        return rebuilt
+
+    def lookup_game(self, sha256_hex: str) -> Optional[Dict[str, object]]:
+        try:
+            digest = bytes.fromhex(sha256_hex)
+        except ValueError:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT system, name, label, region, revision, board, rom_size FROM games WHERE sha256 = ?",
+                (digest,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("system", "name", "label", "region", "revision", "board", "rom_size")
+        return dict(zip(keys, row))
+
+    def cheats_body(self, sha256_hex: str) -> Optional[bytes]:
+        """Encoded {"sha256", "name", "cheats": [...]} for a cartridge, or None."""
+        try:
+            digest = bytes.fromhex(sha256_hex)
+        except ValueError:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT body FROM cheats WHERE sha256 = ?", (digest,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def cheat_summary(self, sha256_hex: str) -> Optional[tuple]:
+        """(cartridge name, cheat count) for a cartridge, or None."""
+        try:
+            digest = bytes.fromhex(sha256_hex)
+        except ValueError:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT name, count FROM cheats WHERE sha256 = ?", (digest,)).fetchone()
+        return (row[0], row[1]) if row else None
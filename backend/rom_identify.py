@@ -0,0 +1,234 @@
+"""ROM header parsing, checksums and the background catalog indexer.
+
+Checksums (CRC32, SHA-1, SHA-256) cover the ROM data without iNES or copier
+headers, which is how game databases key their dumps. Results are cached in SQLite
+by (path, size, mtime), so each file is read once until it changes.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from threading import Lock
+from typing import Dict, Optional
+
+NES_REGIONS = {0: "NTSC", 1: "PAL", 2: "Multi", 3: "Dendy"}
+SNES_REGIONS = {
+    0x00: "JPN", 0x01: "USA", 0x02: "EUR", 0x03: "SWE", 0x04: "FIN", 0x05: "DEN", 0x06: "FRA",
+    0x07: "NLD", 0x08: "ESP", 0x09: "GER", 0x0A: "ITA", 0x0B: "CHN", 0x0D: "KOR", 0x0F: "CAN",
+    0x10: "BRA", 0x11: "AUS",
+}
+GBA_REGIONS = {"J": "JPN", "E": "USA", "P": "EUR", "D": "GER", "F": "FRA", "I": "ITA", "S": "ESP", "K": "KOR"}
+SNES_MAP_MODES = {0x20: "LoROM", 0x21: "HiROM", 0x23: "SA-1", 0x25: "ExHiROM", 0x30: "LoROM", 0x31: "HiROM", 0x32: "ExLoROM", 0x35: "ExHiROM"}
+
+HASH_CHUNK = 1024 * 1024
+
+
+def _ascii(raw: bytes) -> Optional[str]:
+    text = raw.split(b"\x00", 1)[0].decode("ascii", errors="replace").strip()
+    return text or None
+
+
+def parse_ines(head: bytes) -> dict:
+    f6, f7 = head[6], head[7]
+    nes2 = (f7 & 0x0C) == 0x08
+    mapper = (f6 >> 4) | (f7 & 0xF0)
+    if nes2:
+        mapper |= (head[8] & 0x0F) << 8
+    if f6 & 0x08:
+        mirroring = "four-screen"
+    else:
+        mirroring = "vertical" if f6 & 0x01 else "horizontal"
+    return {
+        "format": "NES 2.0" if nes2 else "iNES",
+        "mapper": mapper,
+        "prg_rom": head[4] * 16384,
+        "chr_rom": head[5] * 8192,
+        "mirroring": mirroring,
+        "battery": bool(f6 & 0x02),
+        "trainer": bool(f6 & 0x04),
+        "region": NES_REGIONS.get(head[12] & 0x03) if nes2 else None,
+    }
+
+
+def _snes_header_score(h: bytes) -> int:
+    if len(h) < 0x40:
+        return -1
+    score = 0
+    checksum = h[0x1E] | (h[0x1F] << 8)
+    complement = h[0x1C] | (h[0x1D] << 8)
+    if checksum ^ complement == 0xFFFF:
+        score += 4
+    if h[0x15] in SNES_MAP_MODES:
+        score += 2
+    if all(0x20 <= b < 0x7F for b in h[0x00:0x15]):
+        score += 1
+    return score
+
+
+def parse_snes(f, skip: int, size: int) -> Optional[dict]:
+    best, best_score = None, 0
+    for base in (0x7FC0, 0xFFC0, 0x40FFC0):
+        if skip + base + 0x40 > size:
+            continue
+        f.seek(skip + base)
+        h = f.read(0x40)
+        score = _snes_header_score(h)
+        if score > best_score:
+            best, best_score = h, score
+    if best is None:
+        return None
+    return {
+        "format": "SNES",
+        "title": _ascii(best[0x00:0x15]),
+        "map_mode": SNES_MAP_MODES.get(best[0x15]),
+        "rom_type": best[0x16],
+        "rom_size": (1024 << best[0x17]) if best[0x17] < 16 else None,
+        "ram_size": (1024 << best[0x18]) if 0 < best[0x18] < 16 else 0,
+        "region": SNES_REGIONS.get(best[0x19]),
+        "version": best[0x1B],
+        "checksum": best[0x1E] | (best[0x1F] << 8),
+        "copier_header": bool(skip),
+    }
+
+
+def parse_gba(head: bytes) -> Optional[dict]:
+    if len(head) < 0xC0 or head[0xB2] != 0x96:
+        return None
+    code = _ascii(head[0xAC:0xB0])
+    return {
+        "format": "GBA",
+        "title": _ascii(head[0xA0:0xAC]),
+        "game_code": code,
+        "maker": _ascii(head[0xB0:0xB2]),
+        "version": head[0xBC],
+        "region": GBA_REGIONS.get(code[3]) if code and len(code) == 4 else None,
+    }
+
+
+def identify(path: str) -> dict:
+    """Parse the header of a ROM file and checksum its data in one streaming pass."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(0xC0)
+        skip = 0
+        header = None
+        if head[:4] == b"NES\x1a":
+            system = "nes"
+            header = parse_ines(head)
+            skip = 16 + (512 if header["trainer"] else 0)
+        elif ext == ".gba" or (len(head) >= 0xC0 and head[0xB2] == 0x96):
+            system = "gba"
+            header = parse_gba(head)
+        elif ext in (".sfc", ".smc") or size % 1024 == 512:
+            system = "snes"
+            skip = 512 if size % 1024 == 512 else 0
+            header = parse_snes(f, skip, size)
+        else:
+            system = None
+        crc = 0
+        sha1 = hashlib.sha1()
+        sha256 = hashlib.sha256()
+        # The whole-file digest matches the ETag/?v= of the ROM download endpoints
+        file_sha256 = hashlib.sha256()
+        f.seek(0)
+        file_sha256.update(f.read(skip))
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            crc = zlib.crc32(chunk, crc)
+            sha1.update(chunk)
+            sha256.update(chunk)
+            file_sha256.update(chunk)
+    return {
+        "system": system,
+        "header": header,
+        "crc32": f"{crc & 0xFFFFFFFF:08x}",
+        "sha1": sha1.hexdigest(),
+        "sha256": sha256.hexdigest(),
+        "file_sha256": file_sha256.hexdigest(),
+    }
+
+
+class RomIndexer:
+    """Identifies catalog files in the background and publishes the results to the catalog."""
+
+    def __init__(self, catalog, database, cache_path: str):
+        self.catalog = catalog
+        self.database = database
+        self._lock = Lock()  # one indexing run at a time
+        self._db_lock = Lock()  # the scan cache connection, also used by request threads
+        self._seen: Dict[str, int] = {}  # platform -> catalog version last indexed
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rom_scans (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, info TEXT)"
+        )
+        self._conn.commit()
+
+    def _scan(self, path: str, st: Optional[os.stat_result] = None) -> Optional[dict]:
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        with self._db_lock:
+            row = self._conn.execute("SELECT size, mtime_ns, info FROM rom_scans WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return json.loads(row[2])
+        try:
+            info = identify(path)
+        except OSError:
+            return None
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rom_scans VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, json.dumps(info)),
+            )
+            self._conn.commit()
+        return info
+
+    def file_digest(self, path: str, st: os.stat_result) -> Optional[str]:
+        """SHA-256 of the whole file, from the scan cache (scanning the file if it changed)."""
+        scan = self._scan(path, st)
+        return scan.get("file_sha256") if scan else None
+
+    def describe(self, scan: dict) -> dict:
+        """Public metadata for one file: header fields plus any database match."""
+        header = scan.get("header") or {}
+        game = self.database.lookup_game(scan["sha256"]) if self.database else None
+        # The cheat database also names cartridges (it covers Famicom dumps too)
+        cheat_name, cheat_count = (self.database.cheat_summary(scan["sha256"]) if self.database else None) or (None, 0)
+        return {
+            "system": scan.get("system"),
+            "title": (game or {}).get("name") or cheat_name or header.get("title"),
+            "region": (game or {}).get("region") or header.get("region"),
+            "mapper": header.get("mapper", header.get("map_mode")),
+            "board": (game or {}).get("board"),
+            "crc32": scan["crc32"],
+            "sha1": scan["sha1"],
+            "sha256": scan["sha256"],
+            "file_sha256": scan.get("file_sha256"),
+            "matched": game is not None or cheat_name is not None,
+            "cheats": cheat_count,
+            "header": scan.get("header"),
+        }
+
+    def run_once(self, force: bool = False) -> int:
+        """Index every platform whose listing changed; returns the number of files described."""
+        described = 0
+        with self._lock:
+            for key in self.catalog.platforms():
+                version, items = self.catalog.listing(key)
+                if not force and self._seen.get(key) == version:
+                    continue
+                directory = self.catalog.platform(key).directory
+                details = {}
+                for item in items:
+                    scan = self._scan(os.path.join(directory, item["file"]))
+                    if scan is not None:
+                        details[item["file"]] = self.describe(scan)
+                new_version = self.catalog.set_details(key, details, based_on=version)
+                if new_version is not None:
+                    self._seen[key] = new_version
+                described += len(details)
+        return described
@@ -0,0 +1,117 @@
+"""Verified-token cache and per-user token revocation.
+
+Authenticated routes (EmulatorJS fetches a ROM and its assets with the same
+token over and over) used to decode and HMAC-check the JWT on every request.
+TokenVerifier remembers tokens it has already verified, keyed by a digest of
+the token, in a bounded LRU; an entry is only served until the token's own
+exp, so caching never extends a token's life.
+
+Tokens carry no server-side state, so revocation works by cutoff: revoke(sub)
+records "tokens for this user issued before now are invalid", checked against
+the token's iat on every call (cache hit or not). Ban, delete and password
+changes call it. Cutoffs are kept in memory for the O(1) check and written
+through to a small SQLite file, so they survive restarts and reach the other
+worker processes, which reload the table when PRAGMA data_version shows another
+connection changed it (looked at no more than once per refresh seconds). A cutoff
+is dropped once every token it could affect has expired.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+import jwt
+
+
+class TokenRevoked(jwt.InvalidTokenError):
+    pass
+
+
+class RevocationTable:
+    def __init__(self, path: str, max_token_age: float, refresh: float = 1.0):
+        self.max_token_age = max_token_age
+        self.refresh = refresh
+        self._lock = Lock()
+        self._cutoffs: Dict[str, float] = {}
+        self._data_version = None
+        self._checked_at = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_revocations (sub TEXT PRIMARY KEY, not_before REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._reload(time.time())
+
+    def _reload(self, now: float) -> None:
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        rows = self._conn.execute(
+            "SELECT sub, not_before FROM token_revocations WHERE not_before > ?", (now - self.max_token_age,)
+        ).fetchall()
+        self._cutoffs = dict(rows)
+        self._checked_at = now
+
+    def revoke(self, sub: str, now: Optional[float] = None) -> None:
+        """Invalidate every token for sub issued up to now."""
+        now = time.time() if now is None else now
+        key = sub.lower()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO token_revocations (sub, not_before) VALUES (?, ?)"
+                " ON CONFLICT(sub) DO UPDATE SET not_before = max(not_before, excluded.not_before)",
+                (key, now),
+            )
+            self._conn.execute("DELETE FROM token_revocations WHERE not_before <= ?", (now - self.max_token_age,))
+            self._cutoffs[key] = max(now, self._cutoffs.get(key, 0.0))
+
+    def not_before(self, sub: str, now: float) -> float:
+        if now - self._checked_at >= self.refresh:
+            with self._lock:
+                if now - self._checked_at >= self.refresh:
+                    # data_version only changes when another connection committed
+                    if self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                        self._reload(now)
+                    self._checked_at = now
+        return self._cutoffs.get(sub.lower(), 0.0)
+
+
+class TokenVerifier:
+    def __init__(self, secret: str, algorithm: str, revocations: RevocationTable, capacity: int = 10000):
+        self.secret = secret
+        self.algorithm = algorithm
+        self.revocations = revocations
+        self.capacity = max(1, capacity)
+        self._lock = Lock()
+        self._cache: "OrderedDict[bytes, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> dict:
+        """Payload of a valid token; raises jwt.InvalidTokenError (incl. expiry, TokenRevoked)."""
+        now = time.time()
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            payload = self._cache.get(key)
+            if payload is not None:
+                if payload["exp"] > now:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                else:
+                    del self._cache[key]
+                    payload = None
+        if payload is None:
+            payload = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+            self.misses += 1
+            if isinstance(payload.get("exp"), (int, float)):
+                with self._lock:
+                    self._cache[key] = payload
+                    if len(self._cache) > self.capacity:
+                        self._cache.popitem(last=False)
+        sub = payload.get("sub")
+        # Tokens without iat predate revocation support; any cutoff for the user rejects them
+        if sub and float(payload.get("iat") or 0) < self.revocations.not_before(str(sub), now):
+            raise TokenRevoked("Token revoked")
+        return payload
@@ -0,0 +1,56 @@
+"""Batch packing and adaptive concurrency for outbound translation calls."""
+import asyncio
+from typing import List
+
+
+def pack_batches(texts: List[str], max_items: int = 50, max_chars: int = 4000) -> List[List[str]]:
+    """Split texts into order-preserving batches bounded by item count and total length.
+
+    A single text longer than max_chars gets a batch of its own.
+    """
+    batches: List[List[str]] = []
+    cur: List[str] = []
+    size = 0
+    for t in texts:
+        n = len(t)
+        if cur and (len(cur) >= max_items or size + n > max_chars):
+            batches.append(cur)
+            cur, size = [], 0
+        cur.append(t)
+        size += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+class AdaptiveConcurrency:
+    """AIMD cap on in-flight upstream calls.
+
+    The limit grows by about one slot per window of successes and halves on a
+    failure, so a healthy upstream is driven harder and a struggling one is backed off.
+    """
+
+    def __init__(self, initial: int = 8, minimum: int = 2, maximum: int = 32):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(initial)
+        self._inflight = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < int(self.limit))
+            self._inflight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+        return False
+
+    def success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / max(1.0, self.limit))
+
+    def failure(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2)
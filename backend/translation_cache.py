@@ -0,0 +1,132 @@
+"""Persistent translation memory for /api/translate.
+
+Translations are stored in a small SQLite file in the app data directory, keyed by
+(source, target, format, sha256(text)). Entries expire after a TTL and the table is
+trimmed back to a maximum size by least-recent use.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+# Module logger: open_cache runs at import, before the app configures the root logger
+logger = logging.getLogger(__name__)
+
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class TranslationCache:
+    # last_used is only rewritten when older than this, so hot hits stay read-only
+    TOUCH_INTERVAL = 3600
+    # Run eviction after this many inserted rows
+    EVICT_EVERY = 500
+
+    def __init__(self, path: str, ttl_sec: int = 30 * 24 * 3600, max_entries: int = 200_000):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._since_evict = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " source TEXT NOT NULL, target TEXT NOT NULL, format TEXT NOT NULL,"
+            " text_hash BLOB NOT NULL, translated TEXT NOT NULL,"
+            " created_at INTEGER NOT NULL, last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (source, target, format, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_translations_last_used ON translations(last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_translations_created_at ON translations(created_at)")
+
+    def get_many(self, source: str, target: str, fmt: str, texts: Iterable[str]) -> Dict[str, str]:
+        """Return {text: translation} for every text that has a live entry."""
+        now = int(time.time())
+        by_hash = {_text_hash(t): t for t in texts}
+        if not by_hash:
+            return {}
+        hashes = list(by_hash)
+        found: Dict[str, str] = {}
+        stale: List[bytes] = []
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, translated, created_at, last_used FROM translations"
+                    f" WHERE source = ? AND target = ? AND format = ? AND text_hash IN ({marks})",
+                    (source, target, fmt, *chunk),
+                ).fetchall()
+                for h, translated, created_at, last_used in rows:
+                    if now - created_at > self.ttl_sec:
+                        continue
+                    found[by_hash[h]] = translated
+                    if now - last_used > self.TOUCH_INTERVAL:
+                        stale.append(h)
+            if stale:
+                self._conn.executemany(
+                    "UPDATE translations SET last_used = ? WHERE source = ? AND target = ? AND format = ? AND text_hash = ?",
+                    [(now, source, target, fmt, h) for h in stale],
+                )
+        return found
+
+    def put_many(self, source: str, target: str, fmt: str, pairs: Dict[str, str]) -> None:
+        if not pairs:
+            return
+        now = int(time.time())
+        rows = [(source, target, fmt, _text_hash(t), tr, now, now) for t, tr in pairs.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._since_evict += len(rows)
+            if self._since_evict >= self.EVICT_EVERY:
+                self._since_evict = 0
+                self._evict_locked(now)
+
+    def _evict_locked(self, now: int) -> None:
+        self._conn.execute("DELETE FROM translations WHERE created_at < ?", (now - self.ttl_sec,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_locked(int(time.time()))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(data_dir: str) -> Optional[TranslationCache]:
+    """Open the cache from env settings (default file: data_dir/translations.sqlite3);
+    returns None when disabled or unavailable."""
+    if os.getenv("TRANSLATION_CACHE", "1") != "1":
+        return None
+    path = os.getenv("TRANSLATION_CACHE_PATH") or os.path.join(data_dir, "translations.sqlite3")
+    try:
+        return TranslationCache(
+            path,
+            ttl_sec=int(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600))),
+            max_entries=int(os.getenv("TRANSLATION_CACHE_MAX", "200000")),
+        )
+    except Exception as e:
+        logger.warning(f"Translation cache disabled: cannot open {path}: {e}")
+        return None
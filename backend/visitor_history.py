@@ -0,0 +1,226 @@
+"""Per-minute visitor rollups persisted to a compact SQLite store.
+
+Pings are only appended to an in-memory buffer (bounded; overflow is counted, not
+blocking). A background flush drains it into per-minute buckets holding the ping
+count, new visits by OS letter, and a HyperLogLog sketch of client IPs, so unique
+visitors can be estimated and merged across any time range without storing IPs.
+
+Closed minutes are written in one transaction and also merged into hour and day
+rows, so a long range is answered from the coarse tiers. Sketches are stored
+zlib-compressed; a quiet minute takes a few dozen bytes. Minute rows are kept for
+MINUTE_RETENTION seconds, hour rows for HOUR_RETENTION, day rows indefinitely.
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+import zlib
+from collections import deque
+from threading import Lock
+from typing import Dict, Optional
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+TIERS = (MINUTE, HOUR, DAY)
+MINUTE_RETENTION = 14 * DAY
+HOUR_RETENTION = 400 * DAY
+
+_INV_POW2 = [2.0 ** -r for r in range(65)]
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch with 2**p one-byte registers (p=10: ~3% error)."""
+
+    __slots__ = ("p", "registers")
+
+    def __init__(self, p: int = 10, registers: Optional[bytes] = None):
+        self.p = p
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << p)
+
+    def add(self, value: str) -> None:
+        x = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        rest_bits = 64 - self.p
+        idx = x >> rest_bits
+        rank = rest_bits - (x & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        # Bytewise max of all registers at once: registers are < 0x80, so per byte
+        # ((a | 0x80) - b) keeps bit 7 set exactly where a >= b, without borrows
+        n = len(self.registers)
+        high = int.from_bytes(b"\x80" * n, "big")
+        a = int.from_bytes(self.registers, "big")
+        b = int.from_bytes(other.registers, "big")
+        a_ge = (((a | high) - b) & high) >> 7
+        mask = a_ge * 0xFF
+        self.registers = bytearray(((a & mask) | (b & ~mask)).to_bytes(n, "big"))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(map(_INV_POW2.__getitem__, self.registers))
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # small-range correction
+        return int(round(estimate))
+
+    def to_blob(self) -> bytes:
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_blob(cls, blob: bytes) -> "HyperLogLog":
+        registers = zlib.decompress(blob)
+        return cls(int(math.log2(len(registers))), registers)
+
+
+class _Bucket:
+    __slots__ = ("pings", "visits", "hll")
+
+    def __init__(self, pings: int = 0, visits: Optional[Dict[str, int]] = None, hll: Optional[HyperLogLog] = None):
+        self.pings = pings
+        self.visits: Dict[str, int] = visits or {}  # new visits by OS letter
+        self.hll = hll or HyperLogLog()
+
+    def merge(self, other: "_Bucket") -> None:
+        self.pings += other.pings
+        for k, n in other.visits.items():
+            self.visits[k] = self.visits.get(k, 0) + n
+        self.hll.merge(other.hll)
+
+    def view(self, t: int) -> dict:
+        return {
+            "t": t,
+            "pings": self.pings,
+            "visits": sum(self.visits.values()),
+            "uniques": self.hll.count(),
+            "os": self.visits,
+        }
+
+
+class VisitorHistory:
+    def __init__(self, path: str, max_buffer: int = 100_000):
+        self.path = path
+        self.max_buffer = max_buffer
+        self._buffer: deque = deque()
+        self._open: Dict[int, _Bucket] = {}  # minute start -> bucket not yet written
+        self._lock = Lock()  # one flush at a time
+        self.dropped = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS visitor_rollups ("
+            " res INTEGER NOT NULL, bucket INTEGER NOT NULL,"
+            " pings INTEGER NOT NULL, visits TEXT NOT NULL, hll BLOB NOT NULL,"
+            " PRIMARY KEY (res, bucket)) WITHOUT ROWID"
+        )
+
+    def record(self, ip: str, os_letter: str, new_visit: bool, now: Optional[float] = None) -> None:
+        """Hot path: O(1) append, no hashing or I/O."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self._buffer.append((time.time() if now is None else now, ip, os_letter if new_visit else None))
+
+    def _drain(self) -> None:
+        buf = self._buffer
+        while buf:
+            try:
+                ts, ip, visit_os = buf.popleft()
+            except IndexError:
+                break
+            minute = int(ts) - int(ts) % MINUTE
+            b = self._open.get(minute)
+            if b is None:
+                b = self._open[minute] = _Bucket()
+            b.pings += 1
+            b.hll.add(ip)
+            if visit_os is not None:
+                b.visits[visit_os] = b.visits.get(visit_os, 0) + 1
+
+    def _load(self, res: int, bucket: int) -> Optional[_Bucket]:
+        row = self._conn.execute(
+            "SELECT pings, visits, hll FROM visitor_rollups WHERE res = ? AND bucket = ?", (res, bucket)
+        ).fetchone()
+        if row is None:
+            return None
+        return _Bucket(row[0], json.loads(row[1]), HyperLogLog.from_blob(row[2]))
+
+    def _store(self, res: int, bucket: int, b: _Bucket) -> None:
+        # b itself is never modified, so the same minute can be merged into every tier
+        existing = self._load(res, bucket)  # only set for coarse tiers or a restart mid-minute
+        if existing is not None:
+            existing.merge(b)
+            b = existing
+        self._conn.execute(
+            "INSERT OR REPLACE INTO visitor_rollups VALUES (?, ?, ?, ?, ?)",
+            (res, bucket, b.pings, json.dumps(b.visits, separators=(",", ":")), b.hll.to_blob()),
+        )
+
+    def flush(self, final: bool = False, now: Optional[float] = None) -> int:
+        """Write every closed minute (all minutes if final); returns how many were written."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._drain()
+            current = int(now) - int(now) % MINUTE
+            closed = sorted(m for m in self._open if final or m < current)
+            if not closed:
+                return 0
+            # Take the write lock up front: a deferred BEGIN that reads first fails
+            # with SQLITE_BUSY on upgrade when another worker is flushing
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for minute in closed:
+                    b = self._open[minute]
+                    self._store(MINUTE, minute, b)
+                    for res in (HOUR, DAY):
+                        self._store(res, minute - minute % res, b)
+                self._conn.execute(
+                    "DELETE FROM visitor_rollups WHERE (res = ? AND bucket < ?) OR (res = ? AND bucket < ?)",
+                    (MINUTE, int(now) - MINUTE_RETENTION, HOUR, int(now) - HOUR_RETENTION),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            for minute in closed:
+                del self._open[minute]
+            return len(closed)
+
+    def query(self, since: int, until: int, step: Optional[int] = None, max_points: int = 240) -> dict:
+        """Downsampled series over [since, until) plus totals for the whole range.
+
+        The step is at least (until - since) / max_points and is read from the
+        coarsest tier that fits it; points are aligned to multiples of the step.
+        """
+        span = max(MINUTE, until - since)
+        step = max(step or MINUTE, math.ceil(span / max(1, max_points)), MINUTE)
+        tier = max(t for t in TIERS if t <= step)
+        step = math.ceil(step / tier) * tier
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT bucket, pings, visits, hll FROM visitor_rollups"
+                " WHERE res = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                (tier, since - since % tier, until),
+            ).fetchall()
+        points: Dict[int, _Bucket] = {}
+        for bucket, pings, visits, blob in rows:
+            t = bucket - bucket % step
+            b = _Bucket(pings, json.loads(visits), HyperLogLog.from_blob(blob))
+            if t in points:
+                points[t].merge(b)
+            else:
+                points[t] = b
+        total = _Bucket()
+        for b in points.values():
+            total.merge(b)
+        return {
+            "since": since,
+            "until": until,
+            "step": step,
+            "resolution": tier,
+            "points": [b.view(t) for t, b in sorted(points.items())],
+            "total": total.view(since),
+        }
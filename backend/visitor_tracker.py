@@ -0,0 +1,159 @@
+"""Capacity-bounded, in-memory visitor tracking with running aggregates.
+
+Visitors live in an OrderedDict ordered by last ping: a ping moves its entry to the
+end in O(1), so the front always holds the least recently seen visitors. Expiry
+(sweep) pops from the front until it meets a fresh entry, and when the table is
+full the oldest entry is evicted. Memory is therefore bounded by capacity no matter how many distinct IPs
+arrive, and nothing depends on the listing endpoints being called.
+
+A visitor counts as "real" once a ping arrives at least real_after seconds into
+its visit. Real visitors are also kept in their own dict, and their counts by OS
+letter and by visit-length bucket are adjusted on every ping, expiry and eviction.
+The listing is a snapshot built from that dict alone, rebuilt at most once per
+snapshot_every seconds and only when the set of real visitors (or one of their
+listed fields) changed, so a flood of new, not-yet-real IPs never invalidates it.
+"""
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+# Visit length bucket bounds in seconds, for real visitors (>= real_after)
+DURATION_BUCKETS = ((60, "10s-1m"), (300, "1-5m"), (900, "5-15m"), (None, "15m+"))
+_BUCKET_BOUNDS = [b for b, _ in DURATION_BUCKETS if b is not None]
+
+
+class Visitor:
+    __slots__ = ("ip", "first_seen", "last_seen", "ua", "os", "pings", "bucket")
+
+    def __init__(self, ip: str, now: float, ua: str, os_letter: str):
+        self.ip = ip
+        self.first_seen = now
+        self.last_seen = now
+        self.ua = ua
+        self.os = os_letter
+        self.pings = 1
+        self.bucket: Optional[int] = None  # None until real
+
+
+class VisitorTracker:
+    def __init__(
+        self,
+        capacity: int = 50000,
+        ttl: float = 30.0,
+        real_after: float = 10.0,
+        snapshot_every: float = 1.0,
+    ):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl  # no ping for this long ends the visit
+        self.real_after = real_after
+        self.snapshot_every = snapshot_every
+        self._lock = Lock()
+        self._visitors: "OrderedDict[str, Visitor]" = OrderedDict()
+        self._os_counts: Dict[str, int] = {}
+        self._bucket_counts = [0] * len(DURATION_BUCKETS)
+        self._real: Dict[str, Visitor] = {}  # ip -> visitor, real visitors only
+        self._version = 0  # bumped when the snapshot's content would change
+        self._snapshot: Optional[dict] = None
+        self._snapshot_at = 0.0
+        self._snapshot_version = -1
+        self.evicted = 0  # dropped for capacity before expiring
+
+    def __len__(self) -> int:
+        return len(self._visitors)
+
+    def _count(self, v: Visitor, sign: int) -> None:
+        if v.bucket is None:
+            return
+        if sign > 0:
+            self._real[v.ip] = v
+        else:
+            del self._real[v.ip]
+        self._os_counts[v.os] = self._os_counts.get(v.os, 0) + sign
+        if not self._os_counts[v.os]:
+            del self._os_counts[v.os]
+        self._bucket_counts[v.bucket] += sign
+
+    def _classify(self, v: Visitor) -> None:
+        dur = v.last_seen - v.first_seen
+        v.bucket = bisect_right(_BUCKET_BOUNDS, dur) if dur >= self.real_after else None
+
+    @staticmethod
+    def _listed(v: Visitor) -> Optional[tuple]:
+        # What the snapshot shows of a visitor; None while it is not real
+        return None if v.bucket is None else (v.os, v.bucket, v.first_seen)
+
+    def _remove_oldest(self) -> None:
+        _, v = self._visitors.popitem(last=False)
+        if v.bucket is not None:
+            self._count(v, -1)
+            self._version += 1
+
+    def ping(self, ip: str, ua: str, os_letter: str, now: Optional[float] = None) -> Visitor:
+        now = time.time() if now is None else now
+        with self._lock:
+            v = self._visitors.get(ip)
+            if v is None:
+                v = self._visitors[ip] = Visitor(ip, now, ua, os_letter)
+                if len(self._visitors) > self.capacity:
+                    self._remove_oldest()
+                    self.evicted += 1
+                return v
+            self._visitors.move_to_end(ip)
+            before = self._listed(v)
+            self._count(v, -1)
+            if now - v.last_seen > self.ttl:
+                # Not swept yet, but the previous visit is over
+                v.first_seen, v.pings = now, 0
+            v.last_seen = now
+            if ua:
+                v.ua, v.os = ua, os_letter
+            v.pings += 1
+            self._classify(v)
+            self._count(v, 1)
+            if self._listed(v) != before:
+                self._version += 1
+            return v
+
+    def _sweep_locked(self, cutoff: float) -> int:
+        removed = 0
+        while self._visitors:
+            v = next(iter(self._visitors.values()))
+            if v.last_seen > cutoff:
+                break
+            self._remove_oldest()
+            removed += 1
+        return removed
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop visitors not seen for ttl seconds; returns how many were removed."""
+        cutoff = (time.time() if now is None else now) - self.ttl
+        with self._lock:
+            return self._sweep_locked(cutoff)
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        """Real visitors and aggregates, rebuilt at most every snapshot_every seconds.
+
+        Returns {"count", "os_counts", "duration_buckets", "visitors"}, where visitors
+        are (ip, os letter, first_seen) tuples, shortest visit first. A snapshot is
+        reused while nothing changed, so the sweeper must run for expiry to show.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and (
+                now - self._snapshot_at < self.snapshot_every or self._snapshot_version == self._version
+            ):
+                return snap
+            self._sweep_locked(now - self.ttl)
+            rows = [(v.ip, v.os, v.first_seen) for v in self._real.values()]
+            rows.sort(key=lambda r: r[2], reverse=True)
+            snap = {
+                "count": len(rows),
+                "os_counts": dict(self._os_counts),
+                "duration_buckets": {label: n for (_, label), n in zip(DURATION_BUCKETS, self._bucket_counts)},
+                "visitors": rows,
+            }
+            self._snapshot, self._snapshot_at, self._snapshot_version = snap, now, self._version
+            return snap
@@ -217,6 +217,30 @@ function DynamicPage({ pageKey, emptyLabel }) {
   );
 }
 
+// Live dashboard stream (admin only): one shared server-side snapshot, then JSON merge
+// patches (RFC 7386). onState gets the merged state after every event; onClosed runs once
+// the stream gives up (e.g. 403), so the caller can fall back to polling.
+function mergePatch(target, patch) {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+  const out = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+  for (const [k, v] of Object.entries(patch)) {
+    if (v === null) delete out[k]; else out[k] = mergePatch(out[k], v);
+  }
+  return out;
+}
+
+function openLiveStream(token, onState, onClosed) {
+  let state = null;
+  const es = new EventSource(`/api/metrics/stream?token=${encodeURIComponent(token)}`);
+  es.addEventListener('snapshot', (e) => { state = JSON.parse(e.data); onState(state); });
+  es.addEventListener('patch', (e) => { if (state) { state = mergePatch(state, JSON.parse(e.data)); onState(state); } });
+  es.onerror = () => {
+    // EventSource retries by itself; CLOSED means it will not reconnect
+    if (es.readyState === EventSource.CLOSED) { state = null; onClosed(); }
+  };
+  return es;
+}
+
 function SysadminDashboard() {
   const [sys, setSys] = React.useState(null);
   const [procs, setProcs] = React.useState([]);
@@ -261,11 +285,27 @@ function SysadminDashboard() {
         const sysData = await sysRes.json();
         const procData = await procRes.json();
         if (alive) { setSys(sysData); setProcs(procData); setAuthError(null); setDemo(false); }
+        if (alive && token && !es && !streamFailed && typeof EventSource !== 'undefined') openStream(token);
       } catch {}
     }
+    // Live updates from the shared stream; polling stays as the fallback while it is unavailable.
+    let es = null;
+    let streamFailed = false;
+    function applyState(state) {
+      clearInterval(t);
+      if (!alive) return;
+      if (state.system) setSys(state.system);
+      if (Array.isArray(state.processes)) setProcs(state.processes);
+    }
+    function openStream(token) {
+      es = openLiveStream(token, applyState, () => {
+        es = null; streamFailed = true;
+        clearInterval(t); t = setInterval(loadAll, 5000);
+      });
+    }
     loadAll();
-    const t = setInterval(loadAll, 5000);
-    return () => { alive = false; clearInterval(t); };
+    let t = setInterval(loadAll, 5000);
+    return () => { alive = false; clearInterval(t); if (es) es.close(); };
   }, []);
 
   async function runChecks() {
@@ -275,11 +315,14 @@ function SysadminDashboard() {
     }
     const token = localStorage.getItem('token');
     const headers = token ? { Authorization: `Bearer ${token}` } : {};
-    const [ssh, httpItsusi, httpLocal] = await Promise.all([
-      fetch('/api/checks/port?host=127.0.0.1&port=22', { headers }).then(r=>r.json()).catch(()=>({ok:false})),
-      fetch('/api/checks/http?url=https://itsusi.eu', { headers }).then(r=>r.json()).catch(()=>({ok:false})),
-      fetch('/api/checks/http?url=http://192.168.0.90/health', { headers }).then(r=>r.json()).catch(()=>({ok:false})),
-    ]);
+    // One concurrent batch instead of a round trip per check
+    const targets = ['127.0.0.1:22', 'https://itsusi.eu', 'http://192.168.0.90/health'];
+    const data = await fetch('/api/checks/batch', {
+      method: 'POST',
+      headers: { ...headers, 'Content-Type': 'application/json' },
+      body: JSON.stringify({ targets }),
+    }).then(r=>r.json()).catch(()=>({}));
+    const [ssh, httpItsusi, httpLocal] = targets.map((_, i) => data.results?.[i] || { ok: false });
     setChecks({ ssh, httpItsusi, httpLocal });
   }
 
@@ -877,51 +920,79 @@ function LiveInfraMap() {
       if (!topo?.nodes?.length) return;
       const n = topo.nodes[0];
       if (demo) { setChecks({ [n.id]: { ssh: { open: true }, http: { ok: true, status_code: 200 } } }); return; }
+      // The backend probes every node on its own schedule; just read the cached graph
       const headers = useAuthHeaders();
-      const [ssh, http] = await Promise.all([
-        fetch(`/api/checks/port?host=${encodeURIComponent(n.host)}&port=${n.ssh_port}`, { headers }).then(r=>r.json()).catch(()=>({open:false})),
-        fetch(`/api/checks/http?url=${encodeURIComponent(n.http_url)}`, { headers }).then(r=>r.json()).catch(()=>({ok:false})),
-      ]);
-      setChecks({ [n.id]: { ssh, http } });
+      const r = await fetch('/api/mesh/topology', { headers }).catch(() => null);
+      if (!r || !r.ok) return;
+      const graph = await r.json();
+      setTopo(graph);
+      // A node without an SSH or HTTP probe counts as passing that check when it is up
+      const up = (x) => x.status === 'up';
+      setChecks(Object.fromEntries((graph.nodes || []).map(x => [x.id, { ssh: x.ssh || { open: up(x) }, http: x.http || { ok: up(x) } }])));
     }
     run();
     const t = setInterval(run, 5000);
     return () => clearInterval(t);
   }, [topo?.nodes?.length, demo]);
 
-  // Visitors: ping every 3s and read active list; simulate to reach at least 10 if fewer
+  // Visitors: ping every 3s; the list comes from the live stream's visitors section when it
+  // is available (admins), otherwise from /api/visitors/active every 3s. Simulated entries
+  // top it up to at least 10.
   useEffect(() => {
     let on = true;
-    let tPing, tFetch;
+    let tPing, tFetch = null, es = null;
+    let me = null; // our own entry (masked ip + first_seen), from the last ping
+    const osPool = ['L','W','M','C','A','I'];
+    function show(real) {
+      const need = Math.max(0, 10 - real.length);
+      const sim = Array.from({ length: need }, (_, i) => ({ ip: 'sim*', os: osPool[i % osPool.length], dur_sec: 30 + i * 5, self: false, sim: true }));
+      setVisitors(real.concat(sim));
+    }
+    function fromStream(state) {
+      if (!on || !state.visitors || !Array.isArray(state.visitors.visitors)) return;
+      const now = Date.now() / 1000;
+      // Stream entries carry first_seen; list the shortest visit first, as /api/visitors/active does
+      const real = state.visitors.visitors.slice().sort((a, b) => b.first_seen - a.first_seen).map(v => ({
+        ip: v.ip,
+        os: v.os,
+        dur_sec: Math.max(0, Math.floor(now - v.first_seen)),
+        self: !!me && v.ip === me.masked_ip && v.first_seen === me.first_seen,
+      }));
+      show(real);
+    }
     async function ping() {
-      try { await fetch('/api/visitors/ping', { method: 'POST' }); } catch {}
+      try {
+        const r = await fetch('/api/visitors/ping', { method: 'POST' });
+        me = await r.json().catch(() => me);
+      } catch {}
     }
     async function read() {
       try {
         const r = await fetch('/api/visitors/active');
         const data = await r.json().catch(()=>({visitors: []}));
         if (!on) return;
-        const real = Array.isArray(data.visitors) ? data.visitors : [];
-        let all = real;
-        const need = Math.max(0, 10 - real.length);
-        if (need > 0) {
-          const osPool = ['L','W','M','C','A','I'];
-          const sim = Array.from({ length: need }, (_, i) => ({ ip: 'sim*', os: osPool[i % osPool.length], dur_sec: 30 + i * 5, self: false, sim: true }));
-          all = real.concat(sim);
-        }
-        setVisitors(all);
+        show(Array.isArray(data.visitors) ? data.visitors : []);
       } catch {
         if (!on) return;
         // Full simulation when backend not reachable
-        const osPool = ['L','W','M','C','A','I'];
         const sim = Array.from({ length: 10 }, (_, i) => ({ ip: 'sim*', os: osPool[i % osPool.length], dur_sec: 30 + i * 5, self: i===0, sim: true }));
         setVisitors(sim);
       }
     }
-    ping(); read();
+    function poll() {
+      if (tFetch || !on) return;
+      read();
+      tFetch = setInterval(read, 3000);
+    }
+    ping();
     tPing = setInterval(ping, 3000);
-    tFetch = setInterval(read, 3000);
-    return () => { on = false; clearInterval(tPing); clearInterval(tFetch); };
+    const token = localStorage.getItem('token');
+    if (token && typeof EventSource !== 'undefined') {
+      es = openLiveStream(token, fromStream, () => { es = null; poll(); });
+    } else {
+      poll();
+    }
+    return () => { on = false; clearInterval(tPing); clearInterval(tFetch); if (es) es.close(); };
   }, []);
 
   if (!topo) return <div className="text-gold">Loading topology…</div>;